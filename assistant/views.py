@@ -2,7 +2,9 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from products.models import Product
+from products.recomendation import record_interaction
 from cart.models import Cart, CartItem
+from cart.utils import add_to_cart
 from orders.models import Order, OrderItem, PaymentDetail, ShippingMethod, OrderStatus
 from users.models import UserAccount
 from django.utils import timezone
@@ -35,12 +37,9 @@ class VoiceAssistantView(APIView):
             if not producto:
                 return Response({"result": f"No encontré un producto con el nombre '{data}'."})
 
-            cart, _ = Cart.objects.get_or_create(user_id=user_id, deleted_at__isnull=True, defaults={"total_price": 0})
-            item, created = CartItem.objects.get_or_create(cart=cart, product=producto)
-            item.quantity_product = (item.quantity_product or 0) + 1
-            item.save()
-            cart.total_price += producto.price
-            cart.save()
+            _, created = add_to_cart(user_id, producto)
+            if created:
+                record_interaction(user_id, producto.id, 'cart')
             return Response({"result": f"Se agregó '{producto.name}' al carrito."})
 
         elif intent == "ver_carrito":
@@ -87,6 +86,7 @@ class VoiceAssistantView(APIView):
                     created_at=timezone.now(),
                     modified_at=timezone.now()
                 )
+                record_interaction(user_id, item.product_id, 'orders')
 
             cart.deleted_at = timezone.now()
             cart.save()
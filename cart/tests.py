@@ -1,3 +1,88 @@
-from django.test import TestCase
+import threading
+from decimal import Decimal
+from django.db import connection
+from django.test import TransactionTestCase, skipUnlessDBFeature
+from products.models import Product
+from users.models import UserAccount
+from .models import Cart, CartItem
+from .utils import add_to_cart, remove_from_cart
 
-# Create your tests here.
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentCartTests(TransactionTestCase):
+    """
+    Varios pedidos simultáneos sobre el mismo carrito (p. ej. toques repetidos en la app) no
+    deben perder actualizaciones de la cantidad ni del total. add_to_cart es también el camino
+    de "agregar" del asistente. Requiere bloqueos de fila (SELECT ... FOR UPDATE), por eso no
+    corre en SQLite.
+    """
+    threads = 8
+    quantity = 3
+
+    def setUp(self):
+        self.user = UserAccount.objects.create(
+            name='Test', email='cart@test.com', password='-', cellphone='0', birth_date='2000-01-01', gender='-'
+        )
+        self.product = Product.objects.create(
+            name='Producto', price=Decimal('10.25'), specification='-', category='c', photo='-', brand='b'
+        )
+
+    def run_concurrently(self, tasks):
+        """
+        Ejecuta cada tarea en su propio hilo (y conexión), todas a la vez, y devuelve las
+        excepciones que lanzaron.
+        """
+        barrier = threading.Barrier(len(tasks))
+        errors = []
+
+        def run(task):
+            try:
+                barrier.wait()
+                task()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=run, args=(task,)) for task in tasks]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return errors
+
+    def test_concurrent_adds_are_not_lost(self):
+        errors = self.run_concurrently(
+            [lambda: add_to_cart(self.user.id, self.product, self.quantity)] * self.threads
+        )
+
+        self.assertEqual(errors, [])
+        cart = Cart.objects.get(user=self.user, deleted_at__isnull=True)
+        item = CartItem.objects.get(cart=cart, product=self.product)
+        self.assertEqual(item.quantity_product, self.threads * self.quantity)
+        self.assertEqual(cart.total_price, self.threads * self.quantity * self.product.price)
+
+    def test_concurrent_adds_and_removes_keep_total_consistent(self):
+        other = Product.objects.create(
+            name='Otro', price=Decimal('3.40'), specification='-', category='c', photo='-', brand='b'
+        )
+        add_to_cart(self.user.id, other, 2)
+
+        def remove():
+            try:
+                remove_from_cart(self.user.id, other.id)
+            except CartItem.DoesNotExist:
+                # Otro hilo ya lo quitó
+                pass
+
+        tasks = [
+            lambda: add_to_cart(self.user.id, self.product, self.quantity),
+            lambda: add_to_cart(self.user.id, other, 1),
+            remove,
+        ] * (self.threads // 2)
+        self.assertEqual(self.run_concurrently(tasks), [])
+
+        cart = Cart.objects.get(user=self.user, deleted_at__isnull=True)
+        items = CartItem.objects.filter(cart=cart).select_related('product')
+        self.assertEqual(cart.total_price, sum(item.quantity_product * item.product.price for item in items))
+        self.assertEqual(items.get(product=self.product).quantity_product, self.threads // 2 * self.quantity)
@@ -0,0 +1,70 @@
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from users.models import UserAccount
+from .models import Cart, CartItem
+
+
+def lock_active_cart(user_id, create=False):
+    """
+    Bloquea con SELECT ... FOR UPDATE el carrito activo del usuario y devuelve su ID, así las
+    modificaciones concurrentes del mismo carrito se ejecutan una detrás de otra. Con `create`
+    crea el carrito si no existe, bloqueando antes al usuario para que dos pedidos simultáneos
+    no creen dos carritos activos. Debe llamarse dentro de transaction.atomic().
+    """
+    active = Cart.objects.select_for_update().filter(user_id=user_id, deleted_at__isnull=True)
+    cart_id = active.values_list('id', flat=True).first()
+    if cart_id is None and create:
+        UserAccount.objects.select_for_update().filter(id=user_id).values_list('id', flat=True).first()
+        cart_id = active.values_list('id', flat=True).first()
+        if cart_id is None:
+            cart_id = Cart.objects.create(user_id=user_id, total_price=0).id
+    return cart_id
+
+
+def add_to_cart(user_id, product, quantity=1):
+    """
+    Suma `quantity` unidades de `product` al carrito activo del usuario (creándolo si no
+    existe) en una transacción: la cantidad del item y el total del carrito se incrementan en
+    SQL con F(), sin leer y reescribir los valores en Python. Devuelve (ID del carrito, True si
+    el producto no estaba en el carrito).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        cart_id = lock_active_cart(user_id, create=True)
+        updated = CartItem.objects.filter(cart_id=cart_id, product=product).update(
+            quantity_product=Coalesce('quantity_product', 0) + quantity,
+            modified_at=now
+        )
+        if not updated:
+            CartItem.objects.create(cart_id=cart_id, product=product, quantity_product=quantity)
+        Cart.objects.filter(id=cart_id).update(
+            total_price=F('total_price') + Decimal(str(product.price)) * quantity,
+            modified_at=now
+        )
+    return cart_id, not updated
+
+
+def remove_from_cart(user_id, product_id):
+    """
+    Quita el producto del carrito activo del usuario y resta su subtotal del total en SQL (sin
+    bajar de 0). Lanza Cart.DoesNotExist o CartItem.DoesNotExist si no hay carrito activo o el
+    producto no está en él.
+    """
+    with transaction.atomic():
+        cart_id = lock_active_cart(user_id)
+        if cart_id is None:
+            raise Cart.DoesNotExist
+        item = CartItem.objects.filter(cart_id=cart_id, product_id=product_id) \
+            .values_list('id', 'quantity_product', 'product__price').first()
+        if item is None:
+            raise CartItem.DoesNotExist
+
+        item_id, quantity, price = item
+        CartItem.objects.filter(id=item_id).delete()
+        Cart.objects.filter(id=cart_id).update(
+            total_price=Greatest(F('total_price') - price * (quantity or 0), Value(Decimal('0'))),
+            modified_at=timezone.now()
+        )
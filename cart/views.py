@@ -1,17 +1,20 @@
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from users.permisions import IsAdminRole
+import uuid
 from django.utils import timezone
 from .models import Cart, CartItem
 from .serializers import CartSerializer, CartItemSerializer
+from .utils import add_to_cart, remove_from_cart
 from products.models import Product
-from decimal import Decimal
-from products.serializers import ProductSerializer
+from products.lean import serialize_products
+from products.renderers import CATALOG_RENDERERS
 from logs.models import ActivityLog
 from logs.utils import get_client_ip
-from products.views import recommend_global_based_on_product, recommend_products
+from products.related import recommend_for_product
+from products.recomendation import record_interaction
 
 
 @api_view(['POST'])
@@ -63,53 +66,50 @@ def add_product_to_cart(request):
     Agrega un producto al carrito del usuario autenticado.
     Si no hay un carrito activo (deleted_at=None), se crea uno nuevo.
     Requiere: product_id, quantity_product
+    Con ?recommendations=0 no se calculan recomendaciones (el cliente las pide en paralelo a
+    products/recommended_cart/<product_id>/).
     """
     user = request.user
     product_id = request.data.get('product_id')
-    quantity = int(request.data.get('quantity_product', 1))
 
     if not product_id:
         return Response({'error': 'product_id es obligatorio.'},
                         status=status.HTTP_400_BAD_REQUEST)
 
+    try:
+        quantity = int(request.data.get('quantity_product', 1))
+    except (TypeError, ValueError):
+        quantity = 0
+    if quantity < 1:
+        return Response({'error': 'quantity_product debe ser un entero positivo.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
     try:
         product = Product.objects.get(id=product_id)
     except Product.DoesNotExist:
         return Response({'error': 'Producto no encontrado.'},
                         status=status.HTTP_404_NOT_FOUND)
 
-    cart = Cart.objects.filter(user=user, deleted_at__isnull=True).first()
-
-    if not cart:
-        cart = Cart.objects.create(user=user, total_price=0)
-
-    cart_item, created = CartItem.objects.get_or_create(cart=cart, product=product)
-
+    # Cantidad y total se actualizan en SQL dentro de una transacción (ver cart.utils)
+    cart_id, created = add_to_cart(user.id, product, quantity)
     if created:
-        cart_item.quantity_product = quantity
-    else:
-        cart_item.quantity_product += quantity
-
-    cart_item.save()
-
-    # Actualizar el total del carrito
-    cart.total_price += Decimal(str(product.price)) * Decimal(str(quantity))
-    cart.save()
+        record_interaction(user.id, product.id, 'cart')
 
+    cart_item = CartItem.objects.select_related('product').get(cart_id=cart_id, product=product)
     serializer = CartItemSerializer(cart_item)
-    recommended_ids = recommend_global_based_on_product(str(product.id))
 
-    # Si no hay co-ocurrencias, recomendar los productos más populares
-    if not recommended_ids:
-        recommended_ids = recommend_products()
+    # Solo datos precalculados y con presupuesto de tiempo; si se agota se usan los populares
+    recommended_products = []
+    if request.query_params.get('recommendations') != '0':
+        recommended_products = serialize_products(
+            [uuid.UUID(related_id) for related_id in recommend_for_product(product.id)]
+        )
 
-    recommended_products = Product.objects.filter(id__in=recommended_ids)
-    recommended_serializer = ProductSerializer(recommended_products, many=True)
     return Response({
         'message': 'Producto agregado al carrito exitosamente.',
         'item': serializer.data,
-        'cart_id': cart.id,
-        'recommended_products': recommended_serializer.data
+        'cart_id': cart_id,
+        'recommended_products': recommended_products
     }, status=status.HTTP_200_OK)
 
 
@@ -128,31 +128,22 @@ def remove_product_from_cart(request):
                         status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        cart = Cart.objects.get(user=request.user, deleted_at__isnull=True)
+        remove_from_cart(request.user.id, product_id)
     except Cart.DoesNotExist:
         return Response({'error': 'Carrito no encontrado o eliminado.'},
                         status=status.HTTP_404_NOT_FOUND)
-
-    try:
-        cart_item = CartItem.objects.get(cart=cart, product_id=product_id)
     except CartItem.DoesNotExist:
         return Response({'error': 'Producto no encontrado en el carrito.'},
                         status=status.HTTP_404_NOT_FOUND)
 
-    # Actualizar el total del carrito antes de eliminar
-    product = cart_item.product
-    total_to_subtract = Decimal(str(product.price)) * cart_item.quantity_product
-    cart.total_price -= total_to_subtract
-    cart.total_price = max(cart.total_price, 0)  # Asegura que no sea negativo
-    cart.save()
-
-    cart_item.delete()
+    record_interaction(request.user.id, product_id, 'cart', delta=-1)
 
     return Response({'message': 'Producto eliminado del carrito correctamente.'},
                     status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
+@renderer_classes(CATALOG_RENDERERS)
 @permission_classes([IsAuthenticated])
 def view_cart(request):
     """
@@ -166,14 +157,12 @@ def view_cart(request):
         return Response({'error': 'No hay un carrito activo para este usuario.'},
                         status=status.HTTP_404_NOT_FOUND)
 
-    cart_items = CartItem.objects.filter(cart=cart).select_related('product')
+    cart_items = list(CartItem.objects.filter(cart=cart).values_list('product_id', 'quantity_product'))
 
-    # Retornar una lista de productos con cantidad
-    products_with_quantity = []
-    for item in cart_items:
-        product_data = ProductSerializer(item.product).data
-        product_data['quantity'] = item.quantity_product
-        products_with_quantity.append(product_data)
+    # Retornar una lista de productos con cantidad (serializados por lotes, sin instanciar modelos)
+    products_with_quantity = serialize_products([product_id for product_id, _ in cart_items])
+    for product_data, (_, quantity) in zip(products_with_quantity, cart_items):
+        product_data['quantity'] = quantity
 
     return Response({
         'products': products_with_quantity
@@ -45,6 +45,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'cart',
     'locations',
     'logs',
@@ -144,6 +145,47 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Caché (locmem por defecto, solo válida con un único worker). En producción usar un backend
+# compartido, p. ej. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache y
+# CACHE_LOCATION=redis://host:6379/1, o PyMemcacheCache; el check products.E001 falla si se usa
+# locmem con WEB_CONCURRENCY > 1 y `manage.py check --deploy` advierte sobre locmem
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='e-commerce'),
+    }
+}
+
+# Workers del servidor (la misma variable que lee gunicorn)
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=1, cast=int)
+
+# Segundos que se guardan las respuestas públicas del catálogo
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=300, cast=int)
+
+# Paginación por cursor del catálogo
+CATALOG_PAGE_SIZE = config('CATALOG_PAGE_SIZE', default=20, cast=int)
+CATALOG_MAX_PAGE_SIZE = config('CATALOG_MAX_PAGE_SIZE', default=100, cast=int)
+
+# Productos que se serializan por bloque en las exportaciones con ?stream=
+CATALOG_STREAM_CHUNK_SIZE = config('CATALOG_STREAM_CHUNK_SIZE', default=500, cast=int)
+
+# Búsqueda de productos
+PRODUCT_SEARCH_FALLBACK_MAX_RESULTS = 1000
+
+# Límites de los rangos de precio de los facets de búsqueda (0-50, 50-100, ..., 1000+)
+PRODUCT_FACET_PRICE_BUCKETS = [50, 100, 250, 500, 1000]
+
+# Recomendaciones: cada cuántos segundos los workers verifican si hay un modelo nuevo publicado
+RECOMMENDATION_RELOAD_INTERVAL = config('RECOMMENDATION_RELOAD_INTERVAL', default=30, cast=int)
+
+# Tiempo máximo (ms) de las consultas de recomendaciones por producto antes de usar los populares
+RECOMMENDATION_TIME_BUDGET_MS = config('RECOMMENDATION_TIME_BUDGET_MS', default=150, cast=int)
+
+# Co-ocurrencias: peso de cada fuente de interacción (al cambiarlos ejecutar rebuild_cooccurrence)
+# y productos relacionados guardados por producto
+COOCCURRENCE_WEIGHTS = {'favorites': 1, 'cart': 1, 'orders': 1}
+COOCCURRENCE_TOP_K = config('COOCCURRENCE_TOP_K', default=50, cast=int)
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
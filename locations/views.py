@@ -5,7 +5,9 @@ from rest_framework.permissions import IsAuthenticated
 from .serializers import AddressSerializer
 from .models import AddressUser, Branch
 from django.utils import timezone
-from products.models import Product, Stock
+from products.models import Product
+from products.stock import add_stock
+from products.cache import invalidate_product
 from logs.utils import get_client_ip
 from logs.models import ActivityLog
 from users.models import UserAccount
@@ -104,7 +106,8 @@ def update_stock(request):
         return Response({'error': 'Quantity debe ser un número válido'}, status=400)
 
     try:
-        stock = Stock.objects.create(product_id=product_id, quantity=quantity)
+        stock = add_stock(product_id, quantity)
+        invalidate_product(product_id)
         ip = get_client_ip(request)
         # Asegura que user sea instancia de UserAccount
         user = request.user
@@ -1,3 +1,37 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from products.models import Tag
+from products.tests import create_products, create_user
+from users.models import UserAccount
 
-# Create your tests here.
+
+class OverviewQueryCountTests(TestCase):
+    """
+    El overview serializa todo el catálogo con relaciones precargadas: la cantidad de
+    consultas no crece con la cantidad de productos.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.admin = create_user('admin@test.com', UserAccount.RoleChoices.ADMIN)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.tags = [Tag.objects.create(name=f'tag{i}') for i in range(4)]
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/log/overview')
+        self.assertEqual(response.status_code, 200, response.content[:300])
+        return len(context.captured_queries), response.json()
+
+    def test_overview(self):
+        create_products(5, self.tags, self.admin)
+        expected, _ = self.count_queries()
+
+        create_products(15, self.tags, self.admin, start=5)
+        queries, data = self.count_queries()
+        self.assertEqual(queries, expected)
+        self.assertEqual(len(data['products']), 20)
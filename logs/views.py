@@ -1,4 +1,4 @@
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -8,6 +8,8 @@ from users.models import UserAccount
 from .models import ActivityLog
 from .serializers import ActivityLogSerializer
 from products.serializers import ProductSerializer, TagSerializer2
+from products.categories import get_category_summaries
+from products.streaming import get_stream_format, iter_products, stream_json_object
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from users.permisions import IsAdminRole
@@ -24,16 +26,24 @@ def get(request):
     tags = Tag.objects.all()
     activities = ActivityLog.objects.order_by('-time')[:10]
 
-    categories = products.values('category').distinct()
+    categories = get_category_summaries()
     categories_data = [
         {
             'id': f'CAT{str(i+1).zfill(3)}',
-            'name': c['category'],
-            'description': f'Productos de la categoría {c["category"]}',
-            'productCount': products.filter(category=c['category']).count()
+            'name': c.name,
+            'description': f'Productos de la categoría {c.name}',
+            'productCount': c.product_count
         }
         for i, c in enumerate(categories)
     ]
+    if get_stream_format(request):
+        # Exportación completa: los productos se serializan por bloques mientras se envían
+        return StreamingHttpResponse(stream_json_object([
+            ('products', iter_products(products.order_by('id'))),
+            ('tags', TagSerializer2(tags, many=True).data),
+            ('categories', categories_data),
+            ('activities', ActivityLogSerializer(activities, many=True).data),
+        ]), content_type='application/json')
     return JsonResponse({
         'products': ProductSerializer(products, many=True).data,
         'tags': TagSerializer2(tags, many=True).data,
@@ -4,7 +4,10 @@ from rest_framework.response import Response
 from rest_framework import status
 from .serializers import OrderSerializer, PaymentDetailSerializer, ShippingMethodSerializer, OrderStatusSerializer
 import stripe
-from products.models import Product, Stock
+from products.models import Product
+from products.stock import add_stock, get_stock_total, get_stock_totals
+from products.recomendation import record_interaction
+from products.cache import invalidate_product
 from django.utils import timezone
 from .models import Order, PaymentDetail, OrderItem, OrderStatus, Invoice, ShippingMethod
 from datetime import datetime
@@ -13,7 +16,6 @@ from django.http import JsonResponse
 from django.conf import settings
 from cart.models import Cart, CartItem
 from users.models import UserAccount, Notification
-from django.db.models import Sum
 from users.views import send_multicast_notification
 from users.views import add_notifications
 
@@ -31,13 +33,14 @@ def create_order_with_payment(request):
     except Cart.DoesNotExist:
         return Response({'error': 'No hay un carrito activo para este usuario.'}, status=404)
 
-    cart_items = CartItem.objects.filter(cart=cart)
-    if not cart_items.exists():
+    cart_items = list(CartItem.objects.filter(cart=cart).select_related('product'))
+    if not cart_items:
         return Response({'error': 'El carrito está vacío.'}, status=400)
 
     # Validar stock suficiente
+    stock_totals = get_stock_totals([item.product_id for item in cart_items])
     for item in cart_items:
-        total_stock = Stock.objects.filter(product=item.product).aggregate(total=Sum('quantity'))['total']
+        total_stock = stock_totals.get(item.product_id)
 
         if total_stock is None or total_stock <= 0:
             return Response({
@@ -90,11 +93,11 @@ def create_order_with_payment(request):
             created_at=timezone.now(),
             modified_at=timezone.now()
         )
+        record_interaction(user.id, item.product_id, 'orders')
 
-        Stock.objects.create(
-            product=item.product, quantity=-item.quantity_product
-        )
-        total_stock = Stock.objects.filter(product=item.product).aggregate(total=Sum('quantity'))['total'] or 0
+        add_stock(item.product_id, -item.quantity_product)
+        invalidate_product(item.product_id)
+        total_stock = get_stock_total(item.product_id)
 
         if total_stock < 5:
             add_notifications("¡Stock bajo!", f'El stock de "{item.product.name}" es ahora de {total_stock} unidades.', 'LOW_STOCK', 'ADMIN')
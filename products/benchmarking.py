@@ -0,0 +1,190 @@
+import random
+import statistics
+import time
+import tracemalloc
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+from django.utils import timezone
+from cart.models import Cart, CartItem
+from orders.models import Order, OrderItem, OrderStatus, PaymentDetail, ShippingMethod
+from users.models import UserAccount
+from .models import FavoriteProduct, Product, Tag, Tagged
+
+
+def measure(func, *args, **kwargs):
+    """
+    Ejecuta `func` dos veces: una para medir el tiempo y otra con tracemalloc para medir
+    el pico de memoria (tracemalloc agrega overhead y no debe afectar el tiempo medido).
+    """
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'seconds': round(seconds, 4), 'peak_mb': round(peak / 2 ** 20, 2)}
+
+
+def measure_calls(func, arguments):
+    """
+    Llama a `func` una vez por cada elemento de `arguments` y devuelve la latencia por llamada
+    (p50, p95 y máxima en ms), las llamadas por segundo y el pico de memoria de una llamada
+    adicional con tracemalloc.
+    """
+    latencies = []
+    start = time.perf_counter()
+    for argument in arguments:
+        call_start = time.perf_counter()
+        func(*argument)
+        latencies.append((time.perf_counter() - call_start) * 1000)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        func(*arguments[0])
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    if len(latencies) > 1:
+        percentiles = statistics.quantiles(latencies, n=100, method='inclusive')
+        p50, p95 = percentiles[49], percentiles[94]
+    else:
+        p50 = p95 = latencies[0]
+    return {
+        'calls': len(latencies),
+        'p50_ms': round(p50, 3),
+        'p95_ms': round(p95, 3),
+        'max_ms': round(max(latencies), 3),
+        'throughput': round(len(latencies) / seconds, 1) if seconds else 0,
+        'peak_mb': round(peak / 2 ** 20, 2),
+    }
+
+
+def synthetic_catalog(n_products, n_categories=8, n_brands=50, n_tags=200, tags_per_product=3, seed=42):
+    """
+    Genera filas (id, price, category, brand) y (product_id, tag_name) con la misma forma que
+    los values_list que usa el pipeline de recomendaciones.
+    """
+    rng = random.Random(seed)
+    product_rows = [
+        (f'p{i}', round(rng.uniform(5, 2000), 2), f'cat{rng.randrange(n_categories)}', f'brand{rng.randrange(n_brands)}')
+        for i in range(n_products)
+    ]
+    tag_rows = [
+        (product_id, f'tag{tag}')
+        for product_id, _, _, _ in product_rows
+        for tag in rng.sample(range(n_tags), tags_per_product)
+    ]
+    return product_rows, tag_rows
+
+
+def synthetic_interactions(n_users, n_products, per_user=20, seed=42):
+    """
+    Genera {fuente: [(user_id, product_id)]} con la forma de get_interactions_from_db. La
+    popularidad de los productos sigue una distribución de cola larga (unos pocos productos
+    concentran la mayoría de las interacciones), como en un catálogo real.
+    """
+    rng = random.Random(seed)
+    products = [f'p{i}' for i in range(n_products)]
+    weights = [1 / (rank + 1) for rank in range(n_products)]
+    interactions = {'favorites': [], 'cart': [], 'orders': []}
+    sources = list(interactions)
+    for user in range(n_users):
+        for product_id in rng.choices(products, weights=weights, k=rng.randint(1, per_user * 2)):
+            interactions[rng.choice(sources)].append((f'u{user}', product_id))
+    return interactions
+
+
+def seed_recommendation_dataset(n_interactions, n_products=None, n_users=None, exponent=1.0, seed=42):
+    """
+    Crea en la base de datos productos, tags, usuarios y ~`n_interactions` interacciones
+    (favoritos, carritos y compras en proporción 4:3:3). La popularidad de los productos sigue
+    una ley de potencias (peso 1 / rango^exponent) y la actividad de los usuarios también, así
+    unos pocos productos y usuarios concentran la mayoría de las interacciones. Los pares
+    repetidos se descartan por las restricciones únicas, por lo que devuelve los conteos reales.
+    """
+    rng = random.Random(seed)
+    n_products = n_products or max(100, n_interactions // 20)
+    n_users = n_users or max(50, n_interactions // 10)
+    now = timezone.now()
+
+    tags = Tag.objects.bulk_create([Tag(name=f'bench-tag{i}') for i in range(200)])
+    products = Product.objects.bulk_create([
+        Product(
+            name=f'Producto {i}', price=Decimal(rng.randint(500, 200000)) / 100, specification='-',
+            category=f'cat{rng.randrange(12)}', photo='-', brand=f'brand{rng.randrange(80)}'
+        )
+        for i in range(n_products)
+    ], batch_size=2000)
+    Tagged.objects.bulk_create(
+        [Tagged(tag=tag, product=product) for product in products for tag in rng.sample(tags, 3)],
+        batch_size=2000
+    )
+    users = UserAccount.objects.bulk_create([
+        UserAccount(
+            name=f'bench{i}', email=f'bench{i}@bench.local', password='-', cellphone='0',
+            birth_date='2000-01-01', gender='-', role=UserAccount.RoleChoices.CLIENT
+        )
+        for i in range(n_users)
+    ], batch_size=2000)
+
+    product_weights = [1 / (rank + 1) ** exponent for rank in range(n_products)]
+    user_weights = [1 / (rank + 1) ** exponent for rank in range(n_users)]
+    pairs = {'favorites': set(), 'cart': set(), 'orders': set()}
+    sources = rng.choices(list(pairs), weights=[4, 3, 3], k=n_interactions)
+    chosen_users = rng.choices(range(n_users), weights=user_weights, k=n_interactions)
+    chosen_products = rng.choices(range(n_products), weights=product_weights, k=n_interactions)
+    for source, user, product in zip(sources, chosen_users, chosen_products):
+        pairs[source].add((user, product))
+
+    FavoriteProduct.objects.bulk_create(
+        [FavoriteProduct(user=users[user], product=products[product]) for user, product in pairs['favorites']],
+        batch_size=2000
+    )
+    favorite_counts = Counter(product for _, product in pairs['favorites'])
+    for product, count in favorite_counts.items():
+        products[product].favorite_count = count
+    Product.objects.bulk_update([products[product] for product in favorite_counts], ['favorite_count'], batch_size=2000)
+
+    carts = {
+        user: Cart(user=users[user], total_price=0)
+        for user in sorted({user for user, _ in pairs['cart']})
+    }
+    Cart.objects.bulk_create(carts.values(), batch_size=2000)
+    CartItem.objects.bulk_create(
+        [CartItem(cart=carts[user], product=products[product], quantity_product=1) for user, product in pairs['cart']],
+        batch_size=2000
+    )
+
+    payment = PaymentDetail.objects.create(state='paid', provider='bench', created_at=now, modified_at=now)
+    shipping = ShippingMethod.objects.create(name='bench', cost=0, estimated_time=timedelta(days=1))
+    order_status, _ = OrderStatus.objects.get_or_create(name='bench')
+    orders = {
+        user: Order(
+            user=users[user], payment_detail=payment, shipping_method=shipping, status=order_status,
+            date=now.date(), time=now.time(), total_price=0, created_at=now, modified_at=now
+        )
+        for user in sorted({user for user, _ in pairs['orders']})
+    }
+    Order.objects.bulk_create(orders.values(), batch_size=2000)
+    OrderItem.objects.bulk_create(
+        [
+            OrderItem(order=orders[user], product=products[product], quantity=1, created_at=now, modified_at=now)
+            for user, product in pairs['orders']
+        ],
+        batch_size=2000
+    )
+
+    return {
+        'products': n_products,
+        'users': n_users,
+        'interactions': sum(len(source_pairs) for source_pairs in pairs.values()),
+        **{source: len(source_pairs) for source, source_pairs in pairs.items()},
+    }
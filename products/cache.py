@@ -0,0 +1,166 @@
+import hashlib
+import json
+import time
+from functools import wraps
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+from .conditional import conditional_response
+
+# Vistas cacheadas (nombre -> scopes) para exponer sus contadores
+cached_views = {}
+
+# Backends que guardan la caché en la memoria de cada proceso
+PROCESS_LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    La invalidación por versiones solo llega a los procesos que comparten el backend: con
+    LocMemCache y más de un worker (WEB_CONCURRENCY) los demás seguirían sirviendo respuestas
+    viejas hasta CATALOG_CACHE_TIMEOUT.
+    """
+    if settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES or settings.WEB_CONCURRENCY <= 1:
+        return []
+    return [checks.Error(
+        f'La caché del catálogo usa un backend local al proceso con {settings.WEB_CONCURRENCY} workers.',
+        hint='Configurar CACHE_BACKEND con un backend compartido (Redis o Memcached) y CACHE_LOCATION.',
+        id='products.E001',
+    )]
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_shared_cache_deploy(app_configs, **kwargs):
+    if settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [checks.Warning(
+        'La caché del catálogo usa un backend local al proceso: cada worker invalida solo su propia copia.',
+        hint='En producción configurar CACHE_BACKEND con Redis o Memcached.',
+        id='products.W001',
+    )]
+
+
+def cache_catalog_response(*scopes):
+    """
+    Cachea la respuesta 200 de una vista GET pública del catálogo.
+
+    `scopes` son los conjuntos de datos de los que depende la respuesta (p. ej. 'products' o
+    'product:{product_id}', formateado con los kwargs de la vista). La clave incluye la versión
+    actual de cada scope, así que invalidate_catalog() invalida exactamente las respuestas que
+    dependen de los scopes modificados sin tener que conocer sus claves.
+    """
+    def decorator(view):
+        cached_views[view.__name__] = scopes
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+
+            key = _response_key(view.__name__, request, [scope.format(**kwargs) for scope in scopes])
+            cached = cache.get(key)
+            if cached is not None:
+                _count(view.__name__, 'hits')
+                data, etag, last_modified = cached
+                return conditional_response(request, (etag, last_modified), lambda: Response(data))
+
+            _count(view.__name__, 'misses')
+            response = view(request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                # Se guardan también los validadores para responder 304 desde la caché
+                last_modified = parse_http_date_safe(response.headers.get('Last-Modified', ''))
+                cached = (response.data, response.headers.get('ETag'), last_modified)
+                cache.set(key, cached, settings.CATALOG_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
+
+
+def cached_catalog_value(name, params, scopes, compute):
+    """
+    Devuelve compute() cacheado por `params` (un diccionario ya normalizado) y por la versión
+    de `scopes`, con la misma invalidación que las respuestas de cache_catalog_response.
+    """
+    cached_views.setdefault(name, scopes)
+    key = _scoped_key(name, scopes, json.dumps(params, sort_keys=True, default=str))
+    value = cache.get(key)
+    if value is not None:
+        _count(name, 'hits')
+        return value
+
+    _count(name, 'misses')
+    value = compute()
+    cache.set(key, value, settings.CATALOG_CACHE_TIMEOUT)
+    return value
+
+
+def invalidate_catalog(*scopes):
+    """
+    Invalida todas las respuestas cacheadas que dependen de alguno de los `scopes`.
+    """
+    for scope in scopes:
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), None)
+
+
+def invalidate_product(product_id):
+    invalidate_catalog('products', f'product:{product_id}')
+
+
+def get_cache_stats():
+    keys = {
+        _stats_key(view_name, counter): (view_name, counter)
+        for view_name in cached_views
+        for counter in ('hits', 'misses')
+    }
+    values = cache.get_many(list(keys))
+    stats = {view_name: {'hits': 0, 'misses': 0} for view_name in cached_views}
+    for key, (view_name, counter) in keys.items():
+        stats[view_name][counter] = values.get(key, 0)
+    return stats
+
+
+def _response_key(view_name, request, scopes):
+    return _scoped_key(view_name, scopes, request.get_full_path())
+
+
+def _scoped_key(name, scopes, suffix):
+    version_keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(version_keys)
+    for key in version_keys:
+        if key not in versions:
+            # Si la versión no existe (o fue desalojada) se inicia con un valor que no puede
+            # coincidir con versiones anteriores
+            cache.add(key, _initial_version(), None)
+            versions[key] = cache.get(key)
+
+    digest = hashlib.md5(suffix.encode()).hexdigest()
+    version = '.'.join(str(versions[key]) for key in version_keys)
+    return f'catalog:response:{name}:{version}:{digest}'
+
+
+def _version_key(scope):
+    return f'catalog:version:{scope}'
+
+
+def _stats_key(view_name, counter):
+    return f'catalog:stats:{view_name}:{counter}'
+
+
+def _initial_version():
+    return int(time.time() * 1000)
+
+
+def _count(view_name, counter):
+    key = _stats_key(view_name, counter)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
@@ -0,0 +1,58 @@
+from django.db.models import Count, F
+from django.utils import timezone
+from .models import CategorySummary, Product
+
+
+def apply_category_change(old_category, new_category):
+    """
+    Mueve un producto activo de `old_category` a `new_category` en el resumen de categorías
+    con expresiones F. Usar None para un producto que se crea (old) o se elimina (new).
+    """
+    if old_category == new_category:
+        return
+    if old_category:
+        add_category_products(old_category, -1)
+    if new_category:
+        add_category_products(new_category, 1)
+
+
+def add_category_products(category, delta):
+    """
+    Suma `delta` productos a la categoría, creando su fila en el resumen si no existe.
+    """
+    updated = CategorySummary.objects.filter(name=category).update(
+        product_count=F('product_count') + delta,
+        modified_at=timezone.now()
+    )
+    if not updated:
+        CategorySummary.objects.bulk_create([CategorySummary(name=category)], ignore_conflicts=True)
+        CategorySummary.objects.filter(name=category).update(
+            product_count=F('product_count') + delta,
+            modified_at=timezone.now()
+        )
+
+
+def active_category(product):
+    """
+    Categoría con la que cuenta el producto en el resumen (None si está eliminado).
+    """
+    return None if product.deleted_at else product.category
+
+
+def get_category_summaries():
+    """
+    Devuelve las categorías con al menos un producto activo, ordenadas por nombre.
+    """
+    return CategorySummary.objects.filter(product_count__gt=0).order_by('name')
+
+
+def count_products_by_category():
+    """
+    Cuenta los productos activos por categoría con una sola consulta agrupada.
+    """
+    return dict(
+        Product.objects.filter(deleted_at__isnull=True)
+        .values('category')
+        .annotate(total=Count('id'))
+        .values_list('category', 'total')
+    )
@@ -0,0 +1,60 @@
+import hashlib
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from .models import Product, ProductReview, Tagged
+
+
+def product_validators(product_ids, *extra):
+    """
+    Calcula (etag, last_modified) de la representación de `product_ids` sin serializarlos.
+
+    Combina el modified_at, favorite_count y saldo de stock de cada producto con un resumen
+    (cantidad y fecha máxima) de sus tags y reseñas, en tres consultas por índice. `extra`
+    agrega al ETag lo que no depende de los productos (p. ej. el cursor de la página siguiente).
+    """
+    product_ids = list(product_ids)
+    rows = {
+        row[0]: row for row in
+        Product.objects.filter(id__in=product_ids).values_list(
+            'id', 'modified_at', 'deleted_at', 'favorite_count', 'stock_balance__quantity', 'stock_balance__modified_at'
+        )
+    }
+    tags = Tagged.objects.filter(product_id__in=product_ids).aggregate(
+        count=Count('id'), modified=Max('modified_at'), tag_modified=Max('tag__modified_at')
+    )
+    reviews = ProductReview.objects.filter(product_id__in=product_ids).aggregate(
+        count=Count('id'), modified=Max('created_at')
+    )
+
+    parts = [rows.get(product_id) for product_id in product_ids]
+    parts += [tags['count'], tags['modified'], tags['tag_modified'], reviews['count'], reviews['modified'], *extra]
+    etag = quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+    timestamps = [row[1] for row in rows.values()] + [row[5] for row in rows.values()]
+    timestamps += [tags['modified'], tags['tag_modified'], reviews['modified']]
+    timestamps = [timestamp for timestamp in timestamps if timestamp is not None]
+    last_modified = int(max(timestamps).timestamp()) if timestamps else None
+    return etag, last_modified
+
+
+def conditional_response(request, validators, build_response):
+    """
+    Devuelve 304 si los validadores coinciden con If-None-Match / If-Modified-Since sin llamar
+    a `build_response`; si no, construye la respuesta y le agrega ETag y Last-Modified.
+    """
+    etag, last_modified = validators
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = build_response()
+    set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    if not 200 <= response.status_code < 300 and response.status_code != 304:
+        return
+    if etag and not response.has_header('ETag'):
+        response.headers['ETag'] = etag
+    if last_modified and not response.has_header('Last-Modified'):
+        response.headers['Last-Modified'] = http_date(last_modified)
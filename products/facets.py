@@ -0,0 +1,54 @@
+from collections import Counter
+from django.conf import settings
+from django.db.models import Case, Count, IntegerField, Value, When
+
+
+def price_buckets():
+    """
+    Devuelve los rangos de precio como [(etiqueta, mínimo, máximo)], el último sin máximo.
+    """
+    limits = [0] + list(settings.PRODUCT_FACET_PRICE_BUCKETS)
+    buckets = [(f'{low}-{high}', low, high) for low, high in zip(limits, limits[1:])]
+    buckets.append((f'{limits[-1]}+', limits[-1], None))
+    return buckets
+
+
+def compute_facets(queryset):
+    """
+    Cuenta los productos de `queryset` por categoría, marca y rango de precio en una sola
+    consulta agrupada por (category, brand, rango) y reparte los totales en Python.
+    El número de grupos depende de las categorías y marcas, no de la cantidad de productos.
+    """
+    buckets = price_buckets()
+    bucket = Case(
+        *[When(price__lt=high, then=Value(position)) for position, (_, _, high) in enumerate(buckets[:-1])],
+        default=Value(len(buckets) - 1),
+        output_field=IntegerField()
+    )
+    rows = (
+        queryset.order_by()
+        .annotate(price_bucket=bucket)
+        .values('category', 'brand', 'price_bucket')
+        .annotate(count=Count('id'))
+        .values_list('category', 'brand', 'price_bucket', 'count')
+    )
+
+    categories, brands, prices = Counter(), Counter(), Counter()
+    for category, brand, position, count in rows:
+        categories[category] += count
+        brands[brand] += count
+        prices[position] += count
+
+    return {
+        'category': [{'value': value, 'count': count} for value, count in _sorted(categories)],
+        'brand': [{'value': value, 'count': count} for value, count in _sorted(brands)],
+        'price': [
+            {'value': label, 'min': low, 'max': high, 'count': prices[position]}
+            for position, (label, low, high) in enumerate(buckets)
+        ],
+        'total': sum(categories.values()),
+    }
+
+
+def _sorted(counter):
+    return sorted(counter.items(), key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,37 @@
+from django.db import transaction
+from django.db.models import Count, F
+from .models import FavoriteProduct, Product
+
+
+def add_favorite(user, product):
+    """
+    Marca `product` como favorito de `user` y suma 1 a su favorite_count en la misma
+    transacción. Devuelve False si ya era favorito.
+    """
+    with transaction.atomic():
+        _, created = FavoriteProduct.objects.get_or_create(user=user, product=product)
+        if created:
+            Product.objects.filter(pk=product.pk).update(favorite_count=F('favorite_count') + 1)
+    return created
+
+
+def remove_favorite(user, product_id):
+    """
+    Quita el favorito y resta 1 al favorite_count del producto. Devuelve False si no existía.
+    """
+    with transaction.atomic():
+        deleted, _ = FavoriteProduct.objects.filter(user=user, product_id=product_id).delete()
+        if deleted:
+            Product.objects.filter(pk=product_id).update(favorite_count=F('favorite_count') - deleted)
+    return bool(deleted)
+
+
+def count_favorites_by_product():
+    """
+    Cuenta los favoritos de cada producto con una sola consulta agrupada.
+    """
+    return dict(
+        FavoriteProduct.objects.values('product_id')
+        .annotate(total=Count('id'))
+        .values_list('product_id', 'total')
+    )
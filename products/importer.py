@@ -0,0 +1,161 @@
+import csv
+import json
+import uuid
+from collections import Counter, namedtuple
+from itertools import islice
+from django.db import transaction
+from logs.models import ActivityLog
+from users.views import add_notifications
+from .cache import invalidate_catalog
+from .categories import add_category_products
+from .models import Product, Stock, StockBalance, Tag, Tagged
+from .search import index_products
+from .serializers import ProductSerializer
+
+ImportResult = namedtuple('ImportResult', ['created', 'errors'])
+
+FORMATS = ('csv', 'jsonl')
+
+
+def read_rows(stream, file_format):
+    """
+    Lee un archivo CSV (con encabezado) o JSONL fila por fila sin cargarlo completo en memoria.
+    Devuelve pares (número de línea, datos); datos es None si la línea no se pudo interpretar.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, None if None in row else row
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            data = None
+        yield line_number, data if isinstance(data, dict) else None
+
+
+def import_products(rows, batch_size=500, on_row=None):
+    """
+    Importa productos desde `rows` (pares línea, datos de read_rows) en lotes de `batch_size`.
+
+    Cada fila se valida con ProductSerializer; las válidas de un lote se guardan con bulk_create
+    junto con su stock inicial (columna `stock`) y sus tags (columna `tags`, lista o texto separado
+    por comas) en una transacción. `on_row(line, product, errors)` se llama por cada fila procesada.
+    Devuelve ImportResult(created, errors) con la cantidad creada y los errores por línea.
+    """
+    rows = iter(rows)
+    created = 0
+    errors = []
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+
+        valid = []
+        for line, data in batch:
+            product, stock, tags, row_errors = _validate_row(data)
+            if row_errors:
+                errors.append({'line': line, 'errors': row_errors})
+                if on_row:
+                    on_row(line, None, row_errors)
+                continue
+            valid.append((line, product, stock, tags))
+
+        if valid:
+            _save_batch(valid)
+            created += len(valid)
+            if on_row:
+                for line, product, _, _ in valid:
+                    on_row(line, product, None)
+    return ImportResult(created, errors)
+
+
+def record_import(user, result, ip_address=None):
+    """
+    Registra una sola entrada de ActivityLog y envía una sola notificación por importación,
+    en lugar de una por producto como register_product.
+    """
+    invalidate_catalog('products', 'categories', 'tags')
+    if not result.created:
+        return
+    ActivityLog.objects.create(
+        type='product',
+        user=user,
+        description=f'Importación masiva de {result.created} productos',
+        entity_id=uuid.uuid4(),
+        ip_address=ip_address
+    )
+    add_notifications(
+        '¡Nuevos productos disponibles!',
+        f'Se agregaron {result.created} productos al catálogo',
+        'NEW_PRODUCT',
+        'CLIENT'
+    )
+
+
+def _validate_row(data):
+    if data is None:
+        return None, 0, [], {'non_field_errors': ['Fila con formato inválido']}
+
+    data = dict(data)
+    stock = data.pop('stock', None) or 0
+    tags = data.pop('tags', None) or []
+    errors = {}
+
+    serializer = ProductSerializer(data=data)
+    if not serializer.is_valid():
+        errors.update(serializer.errors)
+
+    try:
+        stock = int(stock)
+        if stock < 0:
+            raise ValueError()
+    except (TypeError, ValueError):
+        errors['stock'] = ['Debe ser un entero mayor o igual a 0']
+
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    if not isinstance(tags, list):
+        errors['tags'] = ['Debe ser una lista de nombres de tags']
+        tags = []
+    tags = list(dict.fromkeys(str(tag).strip() for tag in tags if str(tag).strip()))
+    if any(len(tag) > Tag._meta.get_field('name').max_length for tag in tags):
+        errors['tags'] = ['Nombre de tag demasiado largo']
+
+    if errors:
+        return None, 0, [], errors
+    return Product(**serializer.validated_data), stock, tags, None
+
+
+def _save_batch(valid):
+    products = [product for _, product, _, _ in valid]
+    with transaction.atomic():
+        Product.objects.bulk_create(products)
+
+        stocked = [(product, stock) for _, product, stock, _ in valid if stock]
+        Stock.objects.bulk_create([Stock(product=product, quantity=stock) for product, stock in stocked])
+        StockBalance.objects.bulk_create([StockBalance(product=product, quantity=stock) for product, stock in stocked])
+
+        tags = _get_or_create_tags({name for _, _, _, names in valid for name in names})
+        Tagged.objects.bulk_create(
+            [Tagged(tag=tags[name], product=product) for _, product, _, names in valid for name in names],
+            ignore_conflicts=True
+        )
+
+        for category, count in Counter(product.category for product in products).items():
+            add_category_products(category, count)
+    index_products(products)
+
+
+def _get_or_create_tags(names):
+    tags = {}
+    for tag in Tag.objects.filter(name__in=names).order_by('created_at'):
+        tags.setdefault(tag.name, tag)
+    missing = [Tag(name=name) for name in names if name not in tags]
+    Tag.objects.bulk_create(missing)
+    tags.update((tag.name, tag) for tag in missing)
+    return tags
@@ -0,0 +1,70 @@
+import os
+import re
+import subprocess
+import sys
+
+# Librerías que solo deben cargarse al entrenar o recalcular recomendaciones
+HEAVY_MODULES = ('pandas', 'numpy', 'scipy', 'sklearn')
+
+# Presupuesto del arranque en frío (django.setup() + el módulo importado), en milisegundos
+IMPORT_TIME_BUDGET_MS = 3000
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+
+
+class ImportTimeError(Exception):
+    pass
+
+
+def measure_imports(module, runs=1):
+    """
+    Importa `module` después de django.setup() en un intérprete nuevo con -X importtime y
+    devuelve, de la más rápida de `runs` ejecuciones, (nombre con sangría, self µs, acumulado µs)
+    por cada módulo importado.
+    """
+    best = None
+    for _ in range(max(runs, 1)):
+        imports = _run_importtime(module)
+        if best is None or total_ms(imports) < total_ms(best):
+            best = imports
+    return best
+
+
+def total_ms(imports):
+    return sum(self_us for _, self_us, _ in imports) / 1000
+
+
+def heavy_modules(imports):
+    """
+    Módulos de HEAVY_MODULES (o sus submódulos) que aparecen en `imports`.
+    """
+    return sorted({name.strip() for name, _, _ in imports if name.strip().split('.')[0] in HEAVY_MODULES})
+
+
+def slowest_imports(imports, top=10):
+    """
+    Devuelve [(acumulado ms, nombre)] de los imports de primer nivel más lentos.
+    """
+    return sorted(
+        [(cumulative / 1000, name) for name, _, cumulative in imports if not name.startswith(' ')],
+        reverse=True
+    )[:top]
+
+
+def _run_importtime(module):
+    code = f'import django; django.setup(); import {module}'
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, env=os.environ.copy()
+    )
+    if result.returncode:
+        lines = result.stderr.strip().splitlines()
+        raise ImportTimeError(lines[-1] if lines else f'Error al importar {module}.')
+
+    imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative, indent, name = match.groups()
+            imports.append((indent + name, int(self_us), int(cumulative)))
+    return imports
@@ -0,0 +1,118 @@
+from collections import defaultdict
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from rest_framework import serializers
+from .models import Product, ProductReview, Tagged
+from .reviews import get_review_stats_by_product, serialize_review_stats
+from .serializers import ProductReviewPreviewSerializer, ProductSerializer
+from .stock import get_stock_totals
+
+# Campos calculados de ProductSerializer; el resto son columnas de Product
+COMPUTED_FIELDS = ('tags', 'previews', 'total_stock', 'review_stats')
+
+_layout = None
+
+
+def product_values_fields():
+    """
+    Columnas de Product que hay que pedir con values() para serialize_product_rows.
+    """
+    return [name for name, _ in _get_layout()[0] if name not in COMPUTED_FIELDS]
+
+
+def serialize_product_rows(rows):
+    """
+    Serializa filas de Product.objects.values(*product_values_fields()) con la misma forma
+    (claves, orden y formato de cada valor) que ProductSerializer(many=True), pero sin
+    instanciar modelos ni serializers: las relaciones se cargan por lotes en diccionarios
+    y cada valor se convierte con el campo de DRF correspondiente resuelto una sola vez.
+    """
+    fields, preview_fields = _get_layout()
+    product_ids = [row['id'] for row in rows]
+    tags = _load_tags(product_ids)
+    previews = _load_previews(product_ids, preview_fields)
+    stock_totals = get_stock_totals(product_ids)
+    review_stats = get_review_stats_by_product(product_ids)
+
+    computed = {
+        'tags': lambda product_id: tags.get(product_id, []),
+        'previews': lambda product_id: previews.get(product_id, []),
+        'total_stock': lambda product_id: stock_totals.get(product_id) or 0,
+        'review_stats': lambda product_id: serialize_review_stats(review_stats.get(product_id)),
+    }
+
+    data = []
+    for row in rows:
+        product_id = row['id']
+        item = {}
+        for name, convert in fields:
+            if name in computed:
+                item[name] = computed[name](product_id)
+            else:
+                value = row[name]
+                item[name] = None if value is None else convert(value)
+        data.append(item)
+    return data
+
+
+def serialize_products(product_ids):
+    """
+    Serializa los productos de `product_ids` en ese orden (los IDs inexistentes se omiten).
+    """
+    rows = {row['id']: row for row in Product.objects.filter(id__in=product_ids).values(*product_values_fields())}
+    return serialize_product_rows([rows[product_id] for product_id in product_ids if product_id in rows])
+
+
+def _get_layout():
+    """
+    Resuelve una sola vez el orden de los campos de ProductSerializer y la función de
+    conversión de cada uno (identidad para textos y enteros).
+    """
+    global _layout
+    if _layout is None:
+        fields = [(name, _converter(field)) for name, field in ProductSerializer().fields.items()]
+        preview_fields = [
+            (name, _converter(field)) for name, field in ProductReviewPreviewSerializer().fields.items()
+        ]
+        _layout = (fields, preview_fields)
+    return _layout
+
+
+def _converter(field):
+    if isinstance(field, serializers.UUIDField):
+        return str
+    if isinstance(field, (serializers.CharField, serializers.IntegerField)):
+        return _identity
+    return field.to_representation
+
+
+def _identity(value):
+    return value
+
+
+def _load_tags(product_ids):
+    tags = defaultdict(list)
+    for product_id, tag_id, name in Tagged.objects.filter(product_id__in=product_ids) \
+            .values_list('product_id', 'tag_id', 'tag__name'):
+        tags[product_id].append({'id': str(tag_id), 'name': name})
+    return tags
+
+
+def _load_previews(product_ids, preview_fields):
+    """
+    Últimas 5 reseñas por producto con ROW_NUMBER(), como el Prefetch de ProductSerializer.
+    """
+    names = [name for name, _ in preview_fields]
+    reviews = (
+        ProductReview.objects.filter(product_id__in=product_ids)
+        .annotate(position=Window(RowNumber(), partition_by=F('product_id'), order_by=F('created_at').desc()))
+        .filter(position__lte=5)
+        .order_by('product_id', 'position')
+        .values('product_id', *names)
+    )
+    previews = defaultdict(list)
+    for review in reviews:
+        previews[review['product_id']].append({
+            name: None if review[name] is None else convert(review[name]) for name, convert in preview_fields
+        })
+    return previews
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from products.benchmarking import measure, synthetic_interactions
+from products.recomendation import build_interaction_matrix, build_product_cooccurrence, compute_cooccurrence
+
+
+class Command(BaseCommand):
+    help = 'Compara el cálculo de co-ocurrencias con doble bucle por usuario contra Aᵀ·A con matrices dispersas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--products', type=int, default=20000)
+        parser.add_argument('--per-user', type=int, default=20, help='Interacciones promedio por usuario.')
+        parser.add_argument('--top-k', type=int, default=50)
+        parser.add_argument('--workers', type=int, default=1, help='Además mide el cálculo repartido en N procesos.')
+        parser.add_argument(
+            '--legacy-max',
+            type=int,
+            default=10000,
+            help='Cantidad máxima de usuarios para ejecutar el doble bucle (es cuadrático por usuario).'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"usuarios":>10} {"método":>14} {"segundos":>10} {"pico MB":>10}')
+        for n_users in options['users']:
+            interactions = synthetic_interactions(n_users, options['products'], options['per_user'])
+
+            def sparse_top_k(workers):
+                matrix = build_interaction_matrix(interactions).matrix
+                return list(compute_cooccurrence(matrix, options['top_k'], workers))
+
+            methods = [('sparse', sparse_top_k, 1)]
+            if options['workers'] > 1:
+                methods.append((f'sparse x{options["workers"]}', sparse_top_k, options['workers']))
+            if n_users <= options['legacy_max']:
+                methods.insert(0, ('doble bucle', build_product_cooccurrence, interactions))
+                self.check_same_scores(interactions)
+            else:
+                self.stdout.write(f'{n_users:>10} {"doble bucle":>14} {"omitido (--legacy-max)":>21}')
+
+            for name, method, argument in methods:
+                result = measure(method, argument)
+                self.stdout.write(f'{n_users:>10} {name:>14} {result["seconds"]:>10} {result["peak_mb"]:>10}')
+
+    def check_same_scores(self, interactions):
+        """
+        Verifica que Aᵀ·A sin recorte (top_k=0) da los mismos pares y scores que el doble bucle.
+        """
+        legacy = {
+            (product_id, related_id): count
+            for product_id, related in build_product_cooccurrence(interactions).items()
+            for related_id, count in related.items()
+            if product_id != related_id
+        }
+        matrix, _, product_ids = build_interaction_matrix(interactions, weights={source: 1 for source in interactions})
+        sparse = {
+            (product_ids[row], product_ids[column]): score
+            for row, related in compute_cooccurrence(matrix)
+            for column, score in related
+        }
+        if legacy != sparse:
+            self.stdout.write(self.style.ERROR('Los scores de ambos métodos no coinciden.'))
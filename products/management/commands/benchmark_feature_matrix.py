@@ -0,0 +1,36 @@
+import warnings
+from django.core.management.base import BaseCommand
+from products.benchmarking import measure, synthetic_catalog
+from products.recomendation import build_product_features_dataframe, build_product_feature_matrix
+
+
+class Command(BaseCommand):
+    help = 'Compara tiempo y pico de memoria del builder de features con DataFrame contra la matriz dispersa CSR.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+        parser.add_argument('--tags-per-product', type=int, default=3)
+        parser.add_argument(
+            '--legacy-max',
+            type=int,
+            default=10000,
+            help='Tamaño máximo para ejecutar el builder con DataFrame (es O(tags x productos)).'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"productos":>10} {"builder":>10} {"segundos":>10} {"pico MB":>10}')
+        for size in options['sizes']:
+            product_rows, tag_rows = synthetic_catalog(size, tags_per_product=options['tags_per_product'])
+
+            builders = [('csr', build_product_feature_matrix)]
+            if size <= options['legacy_max']:
+                builders.insert(0, ('dataframe', build_product_features_dataframe))
+            else:
+                self.stdout.write(f'{size:>10} {"dataframe":>10} {"omitido (--legacy-max)":>21}')
+
+            for name, builder in builders:
+                with warnings.catch_warnings():
+                    # El builder con DataFrame emite PerformanceWarning por cada columna de tag
+                    warnings.simplefilter('ignore')
+                    result = measure(builder, product_rows, tag_rows)
+                self.stdout.write(f'{size:>10} {name:>10} {result["seconds"]:>10} {result["peak_mb"]:>10}')
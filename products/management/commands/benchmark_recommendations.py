@@ -0,0 +1,182 @@
+import json
+import random
+import subprocess
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from cart.models import CartItem
+from orders.models import OrderItem
+from products import recomendation
+from products.benchmarking import measure, measure_calls, seed_recommendation_dataset
+from products.models import FavoriteProduct, Product
+from products.personalization import recommend_for_user, train_user_recommendations
+from products.recomendation import (
+    rebuild_product_cooccurrence, recommend_global_based_on_product, recommend_products,
+    train_general_recommendations
+)
+from products.similarity import rebuild_product_similarity, similar_product_ids
+from users.models import UserAccount
+
+# Métrica principal de cada tipo de punto de entrada, usada por --compare
+PRIMARY_METRIC = {'training': 'seconds', 'serving': 'p95_ms'}
+
+# Puntos de entrada de entrenamiento offline
+TRAINING = [
+    ('train_general_recommendations', train_general_recommendations),
+    ('rebuild_product_cooccurrence', rebuild_product_cooccurrence),
+    ('train_user_recommendations', train_user_recommendations),
+    ('rebuild_product_similarity', rebuild_product_similarity),
+]
+
+# Interacciones del dataset de calentamiento (no se mide)
+WARM_UP_INTERACTIONS = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera datasets sintéticos con popularidad de ley de potencias y mide latencia, pico de '
+        'memoria y throughput de cada punto de entrada del motor de recomendaciones. Los '
+        'entrenamientos leen toda la base de datos, así que debe ejecutarse sobre una base vacía '
+        '(p. ej. DB_NAME=e_commerce_bench) o con --allow-existing-data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interactions', type=int, nargs='+', default=[10000, 100000, 1000000])
+        parser.add_argument('--products', type=int, help='Por defecto interacciones / 20.')
+        parser.add_argument('--users', type=int, help='Por defecto interacciones / 10.')
+        parser.add_argument('--exponent', type=float, default=1.0, help='Exponente de la ley de potencias.')
+        parser.add_argument('--queries', type=int, default=200, help='Llamadas por punto de entrada de consulta.')
+        parser.add_argument('--output', help='Archivo JSON donde guardar los resultados.')
+        parser.add_argument('--compare', help='JSON de una ejecución anterior contra el que comparar.')
+        parser.add_argument('--label', default='', help='Etiqueta libre guardada en el JSON (p. ej. rama).')
+        parser.add_argument(
+            '--allow-existing-data',
+            action='store_true',
+            help='Ejecutar aunque la base de datos ya tenga productos o interacciones (sesga los resultados).'
+        )
+
+    def handle(self, *args, **options):
+        if options['queries'] < 1:
+            raise CommandError('--queries debe ser al menos 1.')
+        baseline = self.load_baseline(options['compare']) if options['compare'] else None
+        if not options['allow_existing_data']:
+            self.check_empty_database()
+
+        # La primera ejecución incluye las importaciones diferidas de numpy, scipy y scikit-learn
+        self.warm_up()
+
+        runs = []
+        for n_interactions in options['interactions']:
+            # Cada dataset se crea dentro de una transacción que se revierte al terminar
+            with transaction.atomic():
+                dataset = seed_recommendation_dataset(
+                    n_interactions, options['products'], options['users'], options['exponent']
+                )
+                self.stdout.write(
+                    f'Dataset: {dataset["interactions"]} interacciones, {dataset["products"]} productos, '
+                    f'{dataset["users"]} usuarios'
+                )
+                results = self.run_benchmarks(options['queries'])
+                transaction.set_rollback(True)
+
+            run = {'requested_interactions': n_interactions, 'dataset': dataset, 'results': results}
+            runs.append(run)
+            self.write_results(run, baseline)
+
+        report = {
+            'label': options['label'],
+            'commit': self.current_commit(),
+            'created_at': timezone.now().isoformat(),
+            'parameters': {
+                name: options[name] for name in ('interactions', 'products', 'users', 'exponent', 'queries')
+            },
+            'runs': runs,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Resultados guardados en {options["output"]}'))
+
+    def check_empty_database(self):
+        """
+        Los datasets se crean en la base de datos configurada (y se revierten): con datos previos
+        los entrenamientos también los leen y, en producción, se escribirían hasta millones de filas.
+        """
+        for model in (Product, FavoriteProduct, CartItem, OrderItem):
+            if model.objects.exists():
+                raise CommandError(
+                    f'La base de datos {connection.settings_dict["NAME"]} ya tiene datos ({model.__name__}). '
+                    'Ejecutar sobre una base vacía (p. ej. DB_NAME=e_commerce_bench python manage.py migrate) '
+                    'o usar --allow-existing-data.'
+                )
+
+    def warm_up(self):
+        with transaction.atomic():
+            seed_recommendation_dataset(WARM_UP_INTERACTIONS)
+            for _, func in TRAINING:
+                func()
+            transaction.set_rollback(True)
+        recomendation._published_model.update({'version': None, 'product_ids': [], 'checked_at': 0.0})
+
+    def run_benchmarks(self, queries):
+        rng = random.Random(42)
+        results = []
+
+        for name, func in TRAINING:
+            results.append({'entry_point': name, 'kind': 'training', **measure(func)})
+
+        # Forzar que recommend_products recargue el modelo recién entrenado
+        recomendation._published_model.update({'version': None, 'product_ids': [], 'checked_at': 0.0})
+
+        product_ids = list(Product.objects.values_list('id', flat=True))
+        user_ids = list(UserAccount.objects.filter(email__endswith='@bench.local').values_list('id', flat=True))
+        serving = [
+            ('recommend_products', recommend_products, [() for _ in range(queries)]),
+            (
+                'recommend_global_based_on_product', recommend_global_based_on_product,
+                [(rng.choice(product_ids),) for _ in range(queries)]
+            ),
+            ('recommend_for_user', recommend_for_user, [(rng.choice(user_ids),) for _ in range(queries)]),
+            ('similar_product_ids', similar_product_ids, [(rng.choice(product_ids),) for _ in range(queries)]),
+        ]
+        for name, func, arguments in serving:
+            results.append({'entry_point': name, 'kind': 'serving', **measure_calls(func, arguments)})
+        return results
+
+    def write_results(self, run, baseline):
+        previous = (baseline or {}).get(run['requested_interactions'], {})
+        self.stdout.write(
+            f'{"punto de entrada":>34} {"s / p95 ms":>11} {"p50 ms":>9} {"llamadas/s":>11} {"pico MB":>9} {"vs base":>8}'
+        )
+        for result in run['results']:
+            metric = PRIMARY_METRIC[result['kind']]
+            before = previous.get(result['entry_point'])
+            change = f'{result[metric] / before:.2f}x' if before else '-'
+            self.stdout.write(
+                f'{result["entry_point"]:>34} {result[metric]:>11} {result.get("p50_ms", "-"):>9} '
+                f'{result.get("throughput", "-"):>11} {result["peak_mb"]:>9} {change:>8}'
+            )
+
+    def load_baseline(self, path):
+        """
+        Devuelve {interacciones pedidas: {punto de entrada: métrica principal}} de un JSON anterior.
+        """
+        try:
+            with open(path, encoding='utf-8') as baseline:
+                report = json.load(baseline)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'No se pudo leer {path}: {e}')
+        return {
+            run['requested_interactions']: {
+                result['entry_point']: result[PRIMARY_METRIC[result['kind']]] for result in run['results']
+            }
+            for run in report.get('runs', [])
+        }
+
+    def current_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,79 @@
+import random
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from products.benchmarking import measure
+from products.lean import product_values_fields, serialize_product_rows
+from products.models import Product, ProductReview, Stock, StockBalance, Tag, Tagged
+from products.renderers import FastJSONRenderer
+from products.serializers import ProductSerializer
+from users.models import UserAccount
+
+
+class Command(BaseCommand):
+    help = 'Compara filas por segundo de ProductSerializer + JSONRenderer contra el camino lean + orjson.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000])
+        parser.add_argument(
+            '--synthetic',
+            type=int,
+            default=0,
+            help='Crea N productos de prueba dentro de una transacción que se revierte al terminar.'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['synthetic']:
+                self.create_synthetic_catalog(options['synthetic'])
+
+            self.stdout.write(f'{"filas":>8} {"camino":>12} {"segundos":>10} {"filas/s":>10} {"pico MB":>10}')
+            for size in options['sizes']:
+                products = Product.objects.filter(deleted_at__isnull=True).order_by('-created_at', '-id')[:size]
+                rows = products.count()
+                if not rows:
+                    self.stdout.write(self.style.WARNING('No hay productos; usar --synthetic N.'))
+                    break
+
+                def drf():
+                    return JSONRenderer().render(ProductSerializer(products, many=True).data)
+
+                def lean():
+                    return FastJSONRenderer().render(serialize_product_rows(list(products.values(*product_values_fields()))))
+
+                for name, path in (('serializer', drf), ('lean', lean)):
+                    result = measure(path)
+                    rate = int(rows / result['seconds']) if result['seconds'] else 0
+                    self.stdout.write(f'{rows:>8} {name:>12} {result["seconds"]:>10} {rate:>10} {result["peak_mb"]:>10}')
+
+                if drf() != lean():
+                    self.stdout.write(self.style.ERROR(f'{rows:>8} las salidas no son idénticas'))
+
+            transaction.set_rollback(True)
+
+    def create_synthetic_catalog(self, n_products, seed=42):
+        rng = random.Random(seed)
+        user = UserAccount.objects.filter(role='ADMIN').first() or UserAccount.objects.first()
+        tags = Tag.objects.bulk_create([Tag(name=f'bench-tag{i}') for i in range(50)])
+        products = Product.objects.bulk_create([
+            Product(
+                name=f'Producto {i}', price=Decimal(rng.randint(500, 200000)) / 100, specification='-',
+                category=f'cat{rng.randrange(8)}', photo='-', brand=f'brand{rng.randrange(50)}'
+            )
+            for i in range(n_products)
+        ], batch_size=1000)
+        Tagged.objects.bulk_create(
+            [Tagged(tag=tag, product=product) for product in products for tag in rng.sample(tags, 3)],
+            batch_size=1000
+        )
+        Stock.objects.bulk_create([Stock(product=product, quantity=10) for product in products], batch_size=1000)
+        StockBalance.objects.bulk_create([StockBalance(product=product, quantity=10) for product in products], batch_size=1000)
+        if user:
+            ProductReview.objects.bulk_create(
+                [
+                    ProductReview(product=product, user=user, rating=rng.randint(1, 5), comment='-')
+                    for product in products for _ in range(rng.randrange(8))
+                ],
+                batch_size=1000
+            )
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from products.importtime import (
+    IMPORT_TIME_BUDGET_MS, ImportTimeError, heavy_modules, measure_imports, slowest_imports, total_ms
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide con python -X importtime el arranque en frío de la API y muestra los imports más lentos '
+        '(la misma verificación que ImportTimeTests).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budget-ms', type=int, default=IMPORT_TIME_BUDGET_MS, help='Tiempo máximo de importación.')
+        parser.add_argument('--runs', type=int, default=3, help='Se toma la mejor de N ejecuciones.')
+        parser.add_argument('--top', type=int, default=10, help='Imports de primer nivel más lentos a mostrar.')
+        parser.add_argument('--module', default='e_commerce_backend.urls')
+
+    def handle(self, *args, **options):
+        try:
+            imports = measure_imports(options['module'], options['runs'])
+        except ImportTimeError as e:
+            raise CommandError(str(e))
+
+        for cumulative, name in slowest_imports(imports, options['top']):
+            self.stdout.write(f'{cumulative:>10.1f} ms  {name}')
+        total = total_ms(imports)
+        self.stdout.write(f'{total:>10.1f} ms  total (presupuesto {options["budget_ms"]} ms)')
+
+        loaded = heavy_modules(imports)
+        if loaded:
+            raise CommandError(
+                f'Se importan librerías científicas al iniciar: {", ".join(loaded[:10])}. '
+                f'Importarlas dentro de las funciones que las usan.'
+            )
+        if total > options['budget_ms']:
+            raise CommandError(f'El arranque tarda {total:.0f} ms; el presupuesto es {options["budget_ms"]} ms.')
+        self.stdout.write(self.style.SUCCESS('Arranque dentro del presupuesto.'))
@@ -0,0 +1,45 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from products.importer import FORMATS, import_products, read_rows, record_import
+from users.models import UserAccount
+
+
+class Command(BaseCommand):
+    help = 'Importa productos desde un archivo CSV o JSONL en lotes (stock inicial y tags incluidos).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--user', required=True, help='Email del administrador que realiza la importación.')
+        parser.add_argument('--format', choices=FORMATS, help='Por defecto se deduce de la extensión del archivo.')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        try:
+            user = UserAccount.objects.get(email=options['user'])
+        except UserAccount.DoesNotExist:
+            raise CommandError(f'No existe el usuario {options["user"]}')
+
+        file_format = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if file_format not in FORMATS:
+            raise CommandError('Formato no soportado, usar --format csv o --format jsonl')
+
+        processed = 0
+
+        def on_row(line, product, errors):
+            nonlocal processed
+            processed += 1
+            if errors:
+                details = '; '.join(f'{field}: {" ".join(map(str, messages))}' for field, messages in errors.items())
+                self.stdout.write(self.style.ERROR(f'Línea {line}: {details}'))
+            if processed % options['batch_size'] == 0:
+                self.stdout.write(f'{processed} filas procesadas...')
+
+        with open(options['path'], newline='', encoding='utf-8') as stream:
+            result = import_products(read_rows(stream, file_format), options['batch_size'], on_row)
+        record_import(user, result)
+
+        message = f'{result.created} productos importados, {len(result.errors)} filas con errores.'
+        if result.errors:
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
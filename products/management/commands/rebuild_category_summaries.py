@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from products.cache import invalidate_catalog
+from products.categories import count_products_by_category
+from products.models import CategorySummary
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el resumen de categorías a partir de los productos activos y reporta las diferencias.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Solo reporta las diferencias sin corregirlas.'
+        )
+
+    def handle(self, *args, **options):
+        verify_only = options['verify']
+
+        with transaction.atomic():
+            summaries = dict(CategorySummary.objects.select_for_update().values_list('name', 'product_count'))
+            counts = count_products_by_category()
+
+            drift = []
+            for name in sorted(set(summaries) | set(counts)):
+                expected = counts.get(name, 0)
+                current = summaries.get(name)
+                if current != expected and not (current is None and expected == 0):
+                    drift.append((name, current, expected))
+
+            for name, current, expected in drift:
+                self.stdout.write(f'{name}: resumen={current} productos={expected}')
+
+            if not verify_only and drift:
+                now = timezone.now()
+                CategorySummary.objects.bulk_create(
+                    [CategorySummary(name=name, product_count=expected, modified_at=now) for name, _, expected in drift],
+                    update_conflicts=True,
+                    unique_fields=['name'],
+                    update_fields=['product_count', 'modified_at']
+                )
+                CategorySummary.objects.filter(product_count=0).delete()
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('El resumen de categorías coincide con los productos.'))
+        elif verify_only:
+            self.stdout.write(self.style.WARNING(f'{len(drift)} categorías con diferencias.'))
+        else:
+            invalidate_catalog('categories')
+            self.stdout.write(self.style.SUCCESS(f'{len(drift)} categorías corregidas.'))
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from products.recomendation import rebuild_product_cooccurrence
+
+
+class Command(BaseCommand):
+    help = 'Recalcula la tabla de co-ocurrencias de productos usada por las recomendaciones del carrito.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=settings.COOCCURRENCE_TOP_K,
+            help='Productos relacionados que se guardan por producto (0: todos).'
+        )
+        parser.add_argument('--workers', type=int, default=1, help='Procesos para calcular Aᵀ·A por bloques.')
+
+    def handle(self, *args, **options):
+        created = rebuild_product_cooccurrence(
+            batch_size=options['batch_size'], top_k=options['top_k'], workers=options['workers']
+        )
+        self.stdout.write(self.style.SUCCESS(f'{created} pares de co-ocurrencia generados.'))
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from products.cache import invalidate_product
+from products.models import ProductReviewStats
+from products.reviews import RATINGS, count_reviews_by_product
+
+STATS_FIELDS = ['review_count', 'rating_sum'] + [f'rating_{rating}' for rating in RATINGS]
+
+
+class Command(BaseCommand):
+    help = 'Recalcula las estadísticas de reseñas de cada producto a partir de ProductReview y reporta las diferencias.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Solo reporta las diferencias sin corregirlas.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        verify_only = options['verify']
+        empty = dict.fromkeys(STATS_FIELDS, 0)
+
+        with transaction.atomic():
+            current = {
+                row.pop('product_id'): row
+                for row in ProductReviewStats.objects.select_for_update().values('product_id', *STATS_FIELDS)
+            }
+            expected = count_reviews_by_product()
+
+            drift = []
+            for product_id in set(current) | set(expected):
+                if current.get(product_id, empty) != expected.get(product_id, empty):
+                    drift.append((product_id, current.get(product_id), expected.get(product_id, empty)))
+
+            for product_id, stats, values in drift:
+                self.stdout.write(f'{product_id}: estadísticas={stats} reseñas={values}')
+
+            if not verify_only and drift:
+                now = timezone.now()
+                ProductReviewStats.objects.bulk_create(
+                    [
+                        ProductReviewStats(
+                            product_id=product_id,
+                            rating_average=values['rating_sum'] / values['review_count'] if values['review_count'] else 0,
+                            modified_at=now,
+                            **values
+                        )
+                        for product_id, _, values in drift
+                    ],
+                    batch_size=options['batch_size'],
+                    update_conflicts=True,
+                    unique_fields=['product'],
+                    update_fields=STATS_FIELDS + ['rating_average', 'modified_at']
+                )
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('Las estadísticas de reseñas coinciden.'))
+        elif verify_only:
+            self.stdout.write(self.style.WARNING(f'{len(drift)} productos con diferencias.'))
+        else:
+            for product_id, _, _ in drift:
+                invalidate_product(product_id)
+            self.stdout.write(self.style.SUCCESS(f'{len(drift)} estadísticas corregidas.'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from products.cache import invalidate_catalog
+from products.similarity import rebuild_product_similarity
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el índice de productos similares por contenido (precio, categoría, marca y tags).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--neighbors', type=int, default=10)
+        parser.add_argument(
+            '--product',
+            nargs='+',
+            dest='product_ids',
+            help='Recalcula solo estos productos (p. ej. los recién creados) en lugar de toda la tabla.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        created = rebuild_product_similarity(
+            n_neighbors=options['neighbors'],
+            product_ids=options['product_ids'],
+            batch_size=options['batch_size']
+        )
+        invalidate_catalog('similar')
+        self.stdout.write(self.style.SUCCESS(f'{created} pares de productos similares generados.'))
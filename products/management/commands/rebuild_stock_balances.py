@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from products.cache import invalidate_product
+from products.models import Product, Stock, StockBalance
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los saldos de stock a partir del ledger de Stock y reporta las diferencias.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Solo reporta las diferencias sin corregirlas.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        verify_only = options['verify']
+
+        with transaction.atomic():
+            # Bloquea los saldos para que los movimientos concurrentes se apliquen después del recálculo
+            balances = dict(StockBalance.objects.select_for_update().values_list('product_id', 'quantity'))
+            ledger = dict(
+                Stock.objects.values('product_id')
+                .annotate(total=Sum('quantity'))
+                .values_list('product_id', 'total')
+            )
+
+            drift = []
+            for product_id in Product.objects.values_list('id', flat=True).iterator(chunk_size=options['batch_size']):
+                expected = ledger.get(product_id) or 0
+                current = balances.get(product_id)
+                if current != expected and not (current is None and expected == 0):
+                    drift.append((product_id, current, expected))
+
+            for product_id, current, expected in drift:
+                self.stdout.write(f'{product_id}: saldo={current} ledger={expected}')
+
+            if not verify_only and drift:
+                now = timezone.now()
+                StockBalance.objects.bulk_create(
+                    [StockBalance(product_id=product_id, quantity=expected, modified_at=now)
+                     for product_id, _, expected in drift],
+                    batch_size=options['batch_size'],
+                    update_conflicts=True,
+                    unique_fields=['product'],
+                    update_fields=['quantity', 'modified_at']
+                )
+
+        if not verify_only:
+            for product_id, _, _ in drift:
+                invalidate_product(product_id)
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('Los saldos de stock coinciden con el ledger.'))
+        elif verify_only:
+            self.stdout.write(self.style.WARNING(f'{len(drift)} productos con diferencias.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{len(drift)} saldos corregidos.'))
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from products.cache import invalidate_catalog, invalidate_product
+from products.favorites import count_favorites_by_product
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Recalcula favorite_count de cada producto a partir de FavoriteProduct y reporta las diferencias.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Solo reporta las diferencias sin corregirlas.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        verify_only = options['verify']
+
+        with transaction.atomic():
+            counts = count_favorites_by_product()
+            products = Product.objects.select_for_update().values_list('id', 'favorite_count')
+
+            drift = []
+            for product_id, current in products.iterator(chunk_size=options['batch_size']):
+                expected = counts.get(product_id, 0)
+                if current != expected:
+                    drift.append((product_id, current, expected))
+
+            for product_id, current, expected in drift:
+                self.stdout.write(f'{product_id}: contador={current} favoritos={expected}')
+
+            if not verify_only and drift:
+                Product.objects.bulk_update(
+                    [Product(id=product_id, favorite_count=expected) for product_id, _, expected in drift],
+                    ['favorite_count'],
+                    batch_size=options['batch_size']
+                )
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('Los contadores de favoritos coinciden.'))
+        elif verify_only:
+            self.stdout.write(self.style.WARNING(f'{len(drift)} productos con diferencias.'))
+        else:
+            for product_id, _, _ in drift:
+                invalidate_product(product_id)
+            invalidate_catalog('favorites')
+            self.stdout.write(self.style.SUCCESS(f'{len(drift)} contadores corregidos.'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from products.recomendation import train_general_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Entrena el modelo KMeans de popularidad y publica una nueva versión de GeneralRecommendation.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clusters', type=int, default=5)
+
+    def handle(self, *args, **options):
+        version = train_general_recommendations(n_clusters=options['clusters'])
+        if version is None:
+            self.stdout.write(self.style.WARNING('No hay productos activos para entrenar.'))
+            return
+        self.stdout.write(self.style.SUCCESS(f'Modelo publicado (versión {version}).'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from products.personalization import train_user_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Entrena el modelo de factorización (SVD truncado) y precalcula las recomendaciones por usuario.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--factors', type=int, default=32)
+        parser.add_argument('--top-n', type=int, default=20, help='Productos recomendados guardados por usuario.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        created = train_user_recommendations(
+            n_factors=options['factors'], top_n=options['top_n'], batch_size=options['batch_size']
+        )
+        if not created:
+            self.stdout.write(self.style.WARNING('No hay suficientes interacciones para entrenar.'))
+            return
+        self.stdout.write(self.style.SUCCESS(f'{created} recomendaciones por usuario generadas.'))
@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-18 18:45
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_stock_balances(apps, schema_editor):
+    Stock = apps.get_model('products', 'Stock')
+    StockBalance = apps.get_model('products', 'StockBalance')
+    totals = Stock.objects.values('product_id').annotate(total=Sum('quantity'))
+    StockBalance.objects.bulk_create(
+        [StockBalance(product_id=row['product_id'], quantity=row['total'] or 0) for row in totals],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockBalance',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('quantity', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stock_balance', to='products.product')),
+            ],
+        ),
+        migrations.RunPython(backfill_stock_balances, migrations.RunPython.noop),
+    ]
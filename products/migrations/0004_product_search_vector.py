@@ -0,0 +1,50 @@
+# Generated by Django 5.2 on 2026-10-18 18:46
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS products_product_search_vector_idx '
+        'ON products_product USING gin (search_vector)'
+    )
+    for column in ('name', 'category', 'brand'):
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS products_product_{column}_trgm_idx '
+            f'ON products_product USING gin ({column} gin_trgm_ops)'
+        )
+    schema_editor.execute(
+        "UPDATE products_product SET search_vector = "
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(category, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(brand, '')), 'B') "
+        "WHERE deleted_at IS NULL"
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS products_product_search_vector_idx')
+    for column in ('name', 'category', 'brand'):
+        schema_editor.execute(f'DROP INDEX IF EXISTS products_product_{column}_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_stockbalance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
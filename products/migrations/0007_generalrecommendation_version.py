@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-18 18:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_productcooccurrence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generalrecommendation',
+            name='popularity_score',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='generalrecommendation',
+            name='version',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='generalrecommendation',
+            index=models.Index(fields=['version', '-popularity_score'], name='general_rec_version_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-18 19:01
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_category_summaries(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    CategorySummary = apps.get_model('products', 'CategorySummary')
+    totals = Product.objects.filter(deleted_at__isnull=True).values('category').annotate(total=Count('id'))
+    CategorySummary.objects.bulk_create(
+        [CategorySummary(name=row['category'], product_count=row['total']) for row in totals],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_product_category_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategorySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('product_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_category_summaries, migrations.RunPython.noop),
+    ]
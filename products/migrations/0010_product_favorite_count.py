@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-18 19:03
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_favorite_counts(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    FavoriteProduct = apps.get_model('products', 'FavoriteProduct')
+    counts = (
+        FavoriteProduct.objects.filter(product=OuterRef('pk'))
+        .values('product')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    Product.objects.update(favorite_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_categorysummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='favorite_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-favorite_count', 'id'], name='product_favorite_count_idx'),
+        ),
+        migrations.RunPython(backfill_favorite_counts, migrations.RunPython.noop),
+    ]
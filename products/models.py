@@ -1,5 +1,6 @@
 # App: products/models.py
 from django.db import models
+from django.contrib.postgres.search import SearchVectorField
 import uuid
 
 
@@ -14,6 +15,16 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     modified_at = models.DateTimeField(auto_now=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    favorite_count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='product_created_keyset_idx'),
+            models.Index(fields=['name', 'id'], name='product_name_keyset_idx'),
+            models.Index(fields=['category', 'id'], name='product_category_id_idx'),
+            models.Index(fields=['-favorite_count', 'id'], name='product_favorite_count_idx'),
+        ]
 
 
 class Tag(models.Model):
@@ -41,6 +52,21 @@ class Stock(models.Model):
     modified_at = models.DateTimeField(auto_now=True)
 
 
+class StockBalance(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, related_name='stock_balance')
+    quantity = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    modified_at = models.DateTimeField(auto_now=True)
+
+
+class CategorySummary(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    product_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    modified_at = models.DateTimeField(auto_now=True)
+
+
 class ProductReview(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
@@ -55,6 +81,25 @@ class ProductReview(models.Model):
             raise ValidationError("Rating must be between 1 and 5.")
 
 
+class ProductReviewStats(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, related_name='review_stats')
+    review_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+    rating_average = models.FloatField(default=0)
+    rating_1 = models.IntegerField(default=0)
+    rating_2 = models.IntegerField(default=0)
+    rating_3 = models.IntegerField(default=0)
+    rating_4 = models.IntegerField(default=0)
+    rating_5 = models.IntegerField(default=0)
+    modified_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-rating_average', 'product'], name='review_stats_average_idx'),
+        ]
+
+
 class FavoriteProduct(models.Model):
     user = models.ForeignKey('users.UserAccount', on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
@@ -64,7 +109,53 @@ class FavoriteProduct(models.Model):
         unique_together = ('user', 'product')
 
 
+class ProductCooccurrence(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='cooccurrences')
+    related_product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField(default=0)
+    modified_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('product', 'related_product')
+        indexes = [
+            models.Index(fields=['product', '-score'], name='cooccurrence_top_idx'),
+        ]
+
+
+class ProductSimilarity(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='similarities')
+    similar_product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('product', 'similar_product')
+        indexes = [
+            models.Index(fields=['product', '-score'], name='similarity_top_idx'),
+        ]
+
+
 class GeneralRecommendation(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     cluster_id = models.IntegerField()
+    popularity_score = models.IntegerField(default=0)
+    version = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['version', '-popularity_score'], name='general_rec_version_idx'),
+        ]
+
+
+class UserRecommendation(models.Model):
+    user = models.ForeignKey('users.UserAccount', on_delete=models.CASCADE, related_name='recommendations')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'product')
+        indexes = [
+            models.Index(fields=['user', '-score'], name='user_rec_top_idx'),
+        ]
@@ -0,0 +1,101 @@
+import base64
+import binascii
+import json
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def get_page_size(request):
+    """
+    Lee page_size de la request y lo limita a CATALOG_MAX_PAGE_SIZE.
+    """
+    try:
+        page_size = int(request.GET.get('page_size', settings.CATALOG_PAGE_SIZE))
+    except ValueError:
+        page_size = settings.CATALOG_PAGE_SIZE
+    return min(max(page_size, 1), settings.CATALOG_MAX_PAGE_SIZE)
+
+
+def keyset_paginate(queryset, ordering, cursor=None, page_size=None):
+    """
+    Pagina `queryset` por keyset (seek) en lugar de OFFSET.
+
+    `ordering` es una tupla de campos (con '-' para descendente) cuyo último elemento debe ser
+    único (normalmente 'id') para que el orden sea total y las inserciones concurrentes no
+    dupliquen ni salteen filas. `queryset` puede ser un values() que incluya los campos de
+    `ordering`. Devuelve (items, next_cursor); next_cursor es None en la última página.
+    """
+    page_size = page_size or settings.CATALOG_PAGE_SIZE
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(_seek_filter(ordering, decode_cursor(cursor, ordering, queryset)))
+
+    items = list(queryset[:page_size + 1])
+    if len(items) <= page_size:
+        return items, None
+
+    items = items[:page_size]
+    last = items[-1]
+    return items, encode_cursor(ordering, [_item_value(last, field.lstrip('-')) for field in ordering])
+
+
+def encode_cursor(ordering, values):
+    payload = json.dumps({'o': list(ordering), 'v': [_to_json(value) for value in values]}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, ordering, queryset):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload['o'] != list(ordering) or len(payload['v']) != len(ordering):
+            raise InvalidCursor()
+        return [
+            None if value is None else _ordering_field(queryset, field).to_python(value)
+            for field, value in zip(ordering, payload['v'])
+        ]
+    except (ValueError, KeyError, TypeError, binascii.Error, ValidationError):
+        raise InvalidCursor()
+
+
+def _seek_filter(ordering, values):
+    """
+    Construye (a > x) OR (a = x AND b > y) OR ... respetando la dirección de cada campo.
+    """
+    condition = Q()
+    for position, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        clause = Q(**{f'{name}__{lookup}': values[position]})
+        for previous_field, previous_value in zip(ordering[:position], values[:position]):
+            clause &= Q(**{previous_field.lstrip('-'): previous_value})
+        condition |= clause
+    return condition
+
+
+def _ordering_field(queryset, field):
+    name = field.lstrip('-')
+    if name in queryset.query.annotations:
+        return queryset.query.annotations[name].output_field
+    try:
+        return queryset.model._meta.get_field(name)
+    except FieldDoesNotExist:
+        raise InvalidCursor()
+
+
+def _item_value(item, name):
+    # Admite instancias de modelo y filas de values()
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+
+def _to_json(value):
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
@@ -0,0 +1,103 @@
+from django.db import transaction
+from .models import Product, UserRecommendation
+from .recomendation import build_interaction_matrix, get_interactions_from_db, recommend_products
+
+
+def user_factors(matrix, n_factors):
+    """
+    Factoriza la matriz de interacciones implícitas con SVD truncado. Las interacciones se
+    transforman con log(1 + peso) para que la confianza crezca de forma sublineal con las
+    repeticiones. Devuelve (factores de usuario escalados por los valores singulares,
+    factores de producto), o None si la matriz es demasiado chica para factorizar.
+    """
+    import numpy as np
+    from scipy.sparse.linalg import svds
+
+    n_factors = min(n_factors, min(matrix.shape) - 1)
+    if n_factors < 1:
+        return None
+
+    confidence = matrix.astype(np.float64)
+    confidence.data = np.log1p(confidence.data)
+    users, singular_values, products = svds(confidence, k=n_factors, random_state=42)
+    return (users * singular_values).astype(np.float32), products.astype(np.float32)
+
+
+def top_products_by_user(matrix, factors, excluded_columns, top_n, batch_size=256):
+    """
+    Genera (fila de usuario, [(columna de producto, score)]) con los `top_n` productos de mayor
+    score positivo que el usuario todavía no tiene. Los scores se calculan por bloques de usuarios para
+    acotar la memoria de la matriz densa bloque x productos.
+    """
+    import numpy as np
+
+    users, products = factors
+    top_n = min(top_n, matrix.shape[1])
+    for start in range(0, matrix.shape[0], batch_size):
+        end = min(start + batch_size, matrix.shape[0])
+        scores = users[start:end] @ products
+        seen = matrix[start:end].nonzero()
+        scores[seen] = -np.inf
+        scores[:, excluded_columns] = -np.inf
+
+        best = np.argpartition(-scores, top_n - 1, axis=1)[:, :top_n]
+        for offset, columns in enumerate(best):
+            row_scores = scores[offset, columns]
+            order = np.argsort(-row_scores, kind='stable')
+            yield start + offset, [
+                (int(column), float(score))
+                for column, score in zip(columns[order], row_scores[order])
+                if score > 0
+            ]
+
+
+def train_user_recommendations(n_factors=32, top_n=20, batch_size=1000):
+    """
+    Entrena offline el modelo de factorización sobre favoritos, carrito y compras y reemplaza
+    la tabla UserRecommendation con los `top_n` productos activos recomendados a cada usuario.
+    Devuelve las filas creadas.
+    """
+    matrix, user_ids, product_ids = build_interaction_matrix(get_interactions_from_db())
+    factors = user_factors(matrix, n_factors) if matrix.nnz else None
+    if factors is None:
+        return 0
+
+    active = set(Product.objects.filter(deleted_at__isnull=True).values_list('id', flat=True))
+    excluded = [column for column, product_id in enumerate(product_ids) if product_id not in active]
+
+    with transaction.atomic():
+        UserRecommendation.objects.all().delete()
+        created = 0
+        batch = []
+        for row, recommended in top_products_by_user(matrix, factors, excluded, top_n):
+            batch += [
+                UserRecommendation(user_id=user_ids[row], product_id=product_ids[column], score=score)
+                for column, score in recommended
+            ]
+            if len(batch) >= batch_size:
+                created += len(UserRecommendation.objects.bulk_create(batch))
+                batch = []
+        created += len(UserRecommendation.objects.bulk_create(batch))
+    return created
+
+
+def recommend_for_user(user_id, top_n=6):
+    """
+    Devuelve los IDs (str) de los productos recomendados al usuario según el último
+    entrenamiento. Los usuarios sin recomendaciones (p. ej. recién registrados) o con menos de
+    `top_n` reciben productos populares para completar la lista.
+    """
+    product_ids = [
+        str(product_id) for product_id in
+        UserRecommendation.objects.filter(user_id=user_id, product__deleted_at__isnull=True)
+        .order_by('-score', 'product_id')
+        .values_list('product_id', flat=True)[:top_n]
+    ]
+    if len(product_ids) < top_n:
+        popular = [product_id for product_id in recommend_products(top_n * 2) if product_id not in product_ids]
+        active = {
+            str(product_id) for product_id in
+            Product.objects.filter(id__in=popular, deleted_at__isnull=True).values_list('id', flat=True)
+        }
+        product_ids += [product_id for product_id in popular if product_id in active][:top_n - len(product_ids)]
+    return product_ids
@@ -1,35 +1,49 @@
 from products.models import FavoriteProduct
-from django.db.models import Count
+from django.conf import settings
+from django.db import transaction
+from django.db.models import CharField, F, Max, Value, Window
+from django.db.models.functions import RowNumber
 from orders.models import OrderItem
 from cart.models import CartItem
-from collections import defaultdict
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-import pandas as pd
-from.models import Product, Tagged, Tag
+from collections import defaultdict, namedtuple
+from array import array
+import threading
+import time
+from .models import Product, Tagged, Tag, ProductCooccurrence, GeneralRecommendation
+
+
+# pandas, numpy, scipy y scikit-learn se importan dentro de las funciones de entrenamiento:
+# las vistas solo usan las funciones de consulta de este módulo y así los workers de la API
+# no cargan las librerías científicas al iniciar (ver check_import_time).
+ProductFeatures = namedtuple('ProductFeatures', ['matrix', 'product_ids', 'index', 'feature_names'])
+InteractionMatrix = namedtuple('InteractionMatrix', ['matrix', 'user_ids', 'product_ids'])
 
 
 def get_product_features_from_db():
-    # Paso 1: Obtener todos los productos activos
-    products = Product.objects.filter(deleted_at__isnull=True)
+    # Paso 1: Obtener todos los productos activos y sus tags
+    products = Product.objects.filter(deleted_at__isnull=True).values_list('id', 'price', 'category', 'brand')
+    tags = Tagged.objects.values_list('product_id', 'tag__name')
+    return build_product_features_dataframe(products, tags)
+
+
+def build_product_features_dataframe(product_rows, tag_rows):
+    import pandas as pd
 
     # Paso 2: Construir un DataFrame base
     product_data = []
-    for product in products:
+    for product_id, price, category, brand in product_rows:
         product_data.append({
-            'id': str(product.id),
-            'price': float(product.price),
-            'category': product.category,
-            'brand': product.brand,
+            'id': str(product_id),
+            'price': float(price),
+            'category': category,
+            'brand': brand,
         })
 
     df = pd.DataFrame(product_data)
 
     # Paso 3: Agregar tags como variables binarias (One-hot encoding de tags)
-    tags = Tagged.objects.select_related('tag', 'product')
-    for tag in tags:
-        tag_name = tag.tag.name
-        product_id = str(tag.product.id)
+    for product_id, tag_name in tag_rows:
+        product_id = str(product_id)
         if product_id in df['id'].values:
             df.loc[df['id'] == product_id, tag_name] = 1
 
@@ -46,58 +60,181 @@ def get_product_features_from_db():
     return df, product_ids
 
 
-def recommend_products():
-    # Paso 1: Obtener el DataFrame de productos y sus IDs
-    df, product_ids = get_product_features_from_db()
+def get_product_feature_matrix():
+    """
+    Igual que get_product_features_from_db pero como matriz dispersa (ver build_product_feature_matrix).
+    """
+    products = Product.objects.filter(deleted_at__isnull=True).values_list('id', 'price', 'category', 'brand')
+    tags = Tagged.objects.filter(product__deleted_at__isnull=True).values_list('product_id', 'tag__name')
+    return build_product_feature_matrix(products.iterator(chunk_size=2000), tags.iterator(chunk_size=2000))
+
+
+def build_product_feature_matrix(product_rows, tag_rows):
+    """
+    Construye en una sola pasada una matriz CSR (productos x features) con el precio en la
+    columna 0 y one-hot de categoría, marca y tags. Devuelve ProductFeatures con la matriz,
+    los IDs (str) por fila, el índice id -> fila y el nombre de cada columna.
+    """
+    import numpy as np
+    from scipy import sparse
+
+    columns = {'price': 0}
+    index = {}
+    product_ids = []
+    rows, cols, data = array('q'), array('q'), array('d')
+
+    for product_id, price, category, brand in product_rows:
+        row = len(product_ids)
+        product_id = str(product_id)
+        index[product_id] = row
+        product_ids.append(product_id)
+        rows.extend((row, row, row))
+        cols.extend((
+            0,
+            columns.setdefault(f'category_{category}', len(columns)),
+            columns.setdefault(f'brand_{brand}', len(columns)),
+        ))
+        data.extend((float(price), 1.0, 1.0))
 
-    # Paso 2: Normalizar los datos
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(df)
+    for product_id, tag_name in tag_rows:
+        row = index.get(str(product_id))
+        if row is None:
+            continue
+        rows.append(row)
+        cols.append(columns.setdefault(f'tag_{tag_name}', len(columns)))
+        data.append(1.0)
+
+    matrix = sparse.csr_matrix(
+        (np.frombuffer(data, dtype=np.float64), (np.frombuffer(rows, dtype=np.int64), np.frombuffer(cols, dtype=np.int64))),
+        shape=(len(product_ids), len(columns))
+    )
+    # Los nombres de tag no son únicos: dos Tag con el mismo nombre en un producto suman 2 en la
+    # misma columna al construir la CSR, así que las columnas one-hot se recortan a 1
+    matrix.data[matrix.indices != 0] = 1.0
+    return ProductFeatures(matrix, product_ids, index, list(columns))
+
+
+def train_general_recommendations(n_clusters=5):
+    """
+    Entrena KMeans sobre el catálogo y publica una nueva versión de GeneralRecommendation
+    con el cluster y la popularidad de cada producto. Devuelve la versión publicada.
+    """
+    from sklearn.cluster import KMeans
+    from sklearn.preprocessing import StandardScaler
+
+    # Paso 1: Obtener la matriz dispersa de features y los IDs de productos
+    features = get_product_feature_matrix()
+    product_ids = features.product_ids
+    if not product_ids:
+        return None
+
+    # Paso 2: Normalizar los datos (sin centrar para conservar la matriz dispersa;
+    # KMeans es invariante a la traslación)
+    scaler = StandardScaler(with_mean=False)
+    X_scaled = scaler.fit_transform(features.matrix)
 
     # Paso 3: Aplicar KMeans para clustering
-    kmeans = KMeans(n_clusters=5, random_state=42)
-    df['cluster'] = kmeans.fit_predict(X_scaled)
+    kmeans = KMeans(n_clusters=min(n_clusters, len(product_ids)), random_state=42)
+    clusters = kmeans.fit_predict(X_scaled)
+
+    # Obtener conteo de favoritos por producto (contador mantenido en Product)
+    favorite_dict = {
+        str(product_id): count for product_id, count in
+        Product.objects.filter(favorite_count__gt=0).values_list('id', 'favorite_count')
+    }
 
-    # Obtener conteo de favoritos por producto
-    favorite_counts = FavoriteProduct.objects.values('product').annotate(count=Count('id'))
+    # Paso 4: Publicar la nueva versión y descartar las anteriores
+    with transaction.atomic():
+        version = (GeneralRecommendation.objects.aggregate(version=Max('version'))['version'] or 0) + 1
+        GeneralRecommendation.objects.bulk_create(
+            [
+                GeneralRecommendation(
+                    product_id=product_id,
+                    cluster_id=int(cluster),
+                    popularity_score=favorite_dict.get(product_id, 0),
+                    version=version
+                )
+                for product_id, cluster in zip(product_ids, clusters)
+            ],
+            batch_size=1000
+        )
+        GeneralRecommendation.objects.filter(version__lt=version).delete()
+    return version
 
-    # Convertir a diccionario para acceso rápido
-    favorite_dict = {str(item['product']): item['count'] for item in favorite_counts}
 
-    # Añadirlo a df como columna
-    df['popularity_score'] = product_ids.map(favorite_dict).fillna(0).astype(int)
-    df['product_id'] = product_ids
+_published_model = {'version': None, 'product_ids': [], 'checked_at': 0.0}
+_published_model_lock = threading.Lock()
 
-    # Seleccionar los 6 más populares
-    top_recommendations = df.sort_values('popularity_score', ascending=False).head(6)
-    return top_recommendations['product_id'].tolist()
 
+def get_published_version():
+    return GeneralRecommendation.objects.aggregate(version=Max('version'))['version']
 
-def build_product_cooccurrence():
+
+def recommend_products(top_n=6):
     """
-    Construye un mapa de productos que suelen aparecer juntos en base a:
-    - Favoritos
-    - Carrito
-    - Compras
+    Devuelve los IDs (str) de los productos más populares según el último modelo publicado
+    por train_recommendations. Cada proceso recarga el modelo cuando detecta una versión nueva,
+    consultando la versión como mucho cada RECOMMENDATION_RELOAD_INTERVAL segundos.
     """
-    data = []
+    now = time.monotonic()
+    with _published_model_lock:
+        if now - _published_model['checked_at'] >= settings.RECOMMENDATION_RELOAD_INTERVAL:
+            version = get_published_version()
+            if version != _published_model['version']:
+                _published_model['product_ids'] = load_published_model(version)
+                _published_model['version'] = version
+            _published_model['checked_at'] = now
+        product_ids = _published_model['product_ids']
 
-    # Favoritos
-    favorites = FavoriteProduct.objects.values('user_id', 'product_id')
-    for fav in favorites:
-        data.append((fav['user_id'], fav['product_id']))
+    if not product_ids:
+        return most_favorited_product_ids(top_n)
+    return product_ids[:top_n]
 
-    # Carrito
-    cart_items = CartItem.objects.values('cart__user_id', 'product_id')
-    for cart in cart_items:
-        data.append((cart['cart__user_id'], cart['product_id']))
 
-    # Compras (usuario-producto desde los items)
-    orders = OrderItem.objects.select_related('order', 'product').values(
-        'order__user_id', 'product_id'
-    )
-    for order in orders:
-        data.append((order['order__user_id'], order['product_id']))
+def load_published_model(version, limit=50):
+    if version is None:
+        return []
+    return [
+        str(product_id) for product_id in
+        GeneralRecommendation.objects.filter(version=version)
+        .order_by('-popularity_score', 'product_id')
+        .values_list('product_id', flat=True)[:limit]
+    ]
+
+
+def most_favorited_product_ids(top_n=6):
+    """
+    Respaldo cuando todavía no se entrenó ningún modelo.
+    """
+    return [
+        str(product_id) for product_id in
+        Product.objects.filter(deleted_at__isnull=True)
+        .order_by('-favorite_count', 'id')
+        .values_list('id', flat=True)[:top_n]
+    ]
+
+
+def get_interactions_from_db():
+    """
+    Devuelve {fuente: [(user_id, product_id), ...]} con los favoritos, carritos y compras.
+    """
+    return {
+        'favorites': list(FavoriteProduct.objects.values_list('user_id', 'product_id')),
+        'cart': list(CartItem.objects.values_list('cart__user_id', 'product_id')),
+        'orders': list(OrderItem.objects.values_list('order__user_id', 'product_id')),
+    }
+
+
+def build_product_cooccurrence(interactions):
+    """
+    Construye un mapa de productos que suelen aparecer juntos agrupando las interacciones por
+    usuario y contando cada par con un doble bucle (cuadrático en el historial de cada usuario).
+    Se conserva como referencia para benchmark_cooccurrence; el recálculo usa
+    build_interaction_matrix + compute_cooccurrence.
+    """
+    import pandas as pd
+
+    data = [pair for pairs in interactions.values() for pair in pairs]
 
     # Agrupar por usuario → lista de productos
     df = pd.DataFrame(data, columns=['user_id', 'product_id'])
@@ -114,10 +251,215 @@ def build_product_cooccurrence():
     return cooccur
 
 
-def recommend_global_based_on_product(product_id, top_n=6):
-    cooccur = build_product_cooccurrence()
+def build_interaction_matrix(interactions, weights=None):
+    """
+    Construye la matriz CSR A (usuarios x productos) donde cada interacción suma el peso de su
+    fuente (settings.COOCCURRENCE_WEIGHTS); las interacciones repetidas se acumulan. Devuelve
+    InteractionMatrix con A y los IDs de usuario por fila y de producto por columna.
+    """
+    import numpy as np
+    from scipy import sparse
+
+    weights = settings.COOCCURRENCE_WEIGHTS if weights is None else weights
+    users = {}
+    products = {}
+    rows, cols, data = array('q'), array('q'), array('d')
+
+    for source, pairs in interactions.items():
+        weight = float(weights.get(source, 1))
+        if not weight:
+            continue
+        for user_id, product_id in pairs:
+            rows.append(users.setdefault(user_id, len(users)))
+            cols.append(products.setdefault(product_id, len(products)))
+            data.append(weight)
+
+    matrix = sparse.csr_matrix(
+        (np.frombuffer(data, dtype=np.float64), (np.frombuffer(rows, dtype=np.int64), np.frombuffer(cols, dtype=np.int64))),
+        shape=(len(users), len(products))
+    )
+    return InteractionMatrix(matrix, list(users), list(products))
+
+
+def cooccurrence_shard(matrices, start, end, top_k):
+    """
+    Calcula las filas [start, end) de C = Aᵀ·A (productos x productos) y devuelve, por cada
+    fila, (fila, [(columna, score)]) con las `top_k` columnas de mayor score (todas si top_k
+    es 0) sin contar la diagonal. `matrices` es (A en CSC, A en CSR).
+    """
+    import numpy as np
+
+    by_column, by_row = matrices
+    block = (by_column[:, start:end].T @ by_row).tocsr()
+    result = []
+    for offset in range(block.shape[0]):
+        row = start + offset
+        begin, stop = block.indptr[offset], block.indptr[offset + 1]
+        columns = block.indices[begin:stop]
+        scores = block.data[begin:stop]
+        keep = columns != row
+        columns, scores = columns[keep], scores[keep]
+        if top_k and len(scores) > top_k:
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+            columns, scores = columns[best], scores[best]
+        result.append((row, list(zip(columns.tolist(), scores.tolist()))))
+    return result
+
+
+_shard_matrices = None
+
 
-    related = cooccur.get(product_id, {})
-    sorted_related = sorted(related.items(), key=lambda x: x[1], reverse=True)
+def _init_shard_worker(matrices):
+    global _shard_matrices
+    _shard_matrices = matrices
+
+
+def _run_shard(bounds):
+    return cooccurrence_shard(_shard_matrices, *bounds)
+
+
+def compute_cooccurrence(matrix, top_k=0, workers=1, shard_size=5000):
+    """
+    Genera (fila, [(columna, score)]) por cada producto de la matriz de interacciones. Los
+    productos se procesan en bloques de `shard_size` filas para acotar la memoria del producto
+    Aᵀ·A; con `workers` > 1 los bloques se reparten en un pool de procesos.
+    """
+    matrices = (matrix.tocsc(), matrix.tocsr())
+    n_products = matrix.shape[1]
+    shards = [(start, min(start + shard_size, n_products), top_k) for start in range(0, n_products, shard_size)]
 
-    return [item[0] for item in sorted_related[:top_n]]
+    if workers > 1 and len(shards) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_shard_worker, initargs=(matrices,)) as pool:
+            for result in pool.map(_run_shard, shards):
+                yield from result
+    else:
+        for shard in shards:
+            yield from cooccurrence_shard(matrices, *shard)
+
+
+def rebuild_product_cooccurrence(batch_size=1000, top_k=None, workers=1):
+    """
+    Recalcula desde cero la tabla ProductCooccurrence a partir de favoritos, carrito y compras,
+    guardando los `top_k` productos relacionados de cada producto (0: todos). Es la fuente de
+    verdad de la tabla: record_interaction la mantiene de forma aproximada entre recálculos.
+    """
+    top_k = settings.COOCCURRENCE_TOP_K if top_k is None else top_k
+    matrix, _, product_ids = build_interaction_matrix(get_interactions_from_db())
+    rows = (
+        ProductCooccurrence(product_id=product_ids[row], related_product_id=product_ids[column], score=score)
+        for row, related in compute_cooccurrence(matrix, top_k, workers)
+        for column, score in related
+    )
+
+    with transaction.atomic():
+        ProductCooccurrence.objects.all().delete()
+        created = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                created += len(ProductCooccurrence.objects.bulk_create(batch))
+                batch = []
+        created += len(ProductCooccurrence.objects.bulk_create(batch))
+    return created
+
+
+def get_user_interactions(user_id):
+    """
+    Devuelve pares (product_id, fuente) con las interacciones del usuario (favoritos, carrito y
+    compras), con repeticiones, en una sola consulta.
+    """
+    def with_source(queryset, source):
+        return queryset.annotate(source=Value(source, output_field=CharField())).values_list('product_id', 'source')
+
+    favorites = with_source(FavoriteProduct.objects.filter(user_id=user_id), 'favorites')
+    cart_items = with_source(CartItem.objects.filter(cart__user_id=user_id), 'cart')
+    order_items = with_source(OrderItem.objects.filter(order__user_id=user_id), 'orders')
+    return list(favorites.union(cart_items, order_items, all=True))
+
+
+# Scores menores a este valor se consideran 0 (restos de sumar y restar pesos no enteros)
+COOCCURRENCE_EPSILON = 1e-9
+
+
+def record_interaction(user_id, product_id, source, delta=1):
+    """
+    Actualiza incrementalmente las co-ocurrencias cuando el usuario agrega (delta=1) o quita
+    (delta=-1) una interacción de `source` ('favorites', 'cart' u 'orders') con `product_id`.
+
+    Con A[usuario, producto] = suma de los pesos (COOCCURRENCE_WEIGHTS) de sus interacciones,
+    el recálculo guarda Aᵀ·A; sumar la interacción cambia cada par (producto, otro) en
+    peso(source) x A[usuario, otro], en ambas direcciones. Después se recortan los productos
+    afectados a sus COOCCURRENCE_TOP_K relacionados (cap_cooccurrence).
+
+    La tabla queda aproximada entre recálculos: un par recortado que vuelve a entrar empieza
+    desde el incremento actual y dos interacciones simultáneas del mismo usuario pueden contar
+    su par dos veces (esta función corre después de confirmar cada cambio). Por eso
+    rebuild_cooccurrence debe ejecutarse periódicamente.
+    """
+    weights = settings.COOCCURRENCE_WEIGHTS
+    weight = float(weights.get(source, 1))
+    others = defaultdict(float)
+    for other, other_source in get_user_interactions(user_id):
+        if str(other) != str(product_id):
+            others[other] += float(weights.get(other_source, 1))
+    if not weight or not any(others.values()):
+        return
+
+    by_amount = defaultdict(list)
+    for other, other_weight in others.items():
+        if other_weight:
+            by_amount[weight * other_weight].append(other)
+
+    with transaction.atomic():
+        if delta > 0:
+            related = [other for related_ids in by_amount.values() for other in related_ids]
+            ProductCooccurrence.objects.bulk_create(
+                [ProductCooccurrence(product_id=product_id, related_product_id=other) for other in related] +
+                [ProductCooccurrence(product_id=other, related_product_id=product_id) for other in related],
+                ignore_conflicts=True
+            )
+        for amount, related_ids in by_amount.items():
+            ProductCooccurrence.objects.filter(product_id=product_id, related_product_id__in=related_ids) \
+                .update(score=F('score') + delta * amount)
+            ProductCooccurrence.objects.filter(product_id__in=related_ids, related_product_id=product_id) \
+                .update(score=F('score') + delta * amount)
+        if delta < 0:
+            ProductCooccurrence.objects.filter(product_id=product_id, score__lte=COOCCURRENCE_EPSILON).delete()
+            ProductCooccurrence.objects.filter(related_product_id=product_id, score__lte=COOCCURRENCE_EPSILON).delete()
+        else:
+            cap_cooccurrence([product_id, *(other for related_ids in by_amount.values() for other in related_ids)])
+
+
+def cap_cooccurrence(product_ids, top_k=None):
+    """
+    Borra los pares de los productos de `product_ids` que quedan fuera de sus `top_k`
+    relacionados de mayor score (COOCCURRENCE_TOP_K; 0 no recorta). Usa dos consultas.
+    """
+    top_k = settings.COOCCURRENCE_TOP_K if top_k is None else top_k
+    if not top_k:
+        return 0
+    extra = list(
+        ProductCooccurrence.objects.filter(product_id__in=product_ids)
+        .annotate(rank=Window(
+            RowNumber(), partition_by=F('product_id'), order_by=[F('score').desc(), F('related_product_id').asc()]
+        ))
+        .filter(rank__gt=top_k)
+        .values_list('id', flat=True)
+    )
+    if extra:
+        ProductCooccurrence.objects.filter(id__in=extra).delete()
+    return len(extra)
+
+
+def recommend_global_based_on_product(product_id, top_n=6):
+    """
+    Devuelve los IDs de los productos activos que más co-ocurren con `product_id`.
+    """
+    return list(
+        ProductCooccurrence.objects.filter(product_id=product_id, related_product__deleted_at__isnull=True)
+        .order_by('-score', 'related_product_id')
+        .values_list('related_product_id', flat=True)[:top_n]
+    )
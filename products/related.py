@@ -0,0 +1,71 @@
+import time
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from .models import Product
+from .recomendation import recommend_global_based_on_product, recommend_products
+from .similarity import similar_product_ids
+
+
+def recommend_for_product(product_id, top_n=6, budget_ms=None):
+    """
+    Devuelve los IDs (str) de los productos activos a recomendar junto a `product_id` (p. ej. al
+    agregarlo al carrito), leyendo solo datos precalculados: primero las co-ocurrencias, luego
+    los similares por contenido y por último los populares del modelo publicado, que ya están
+    en memoria.
+
+    Las consultas tienen un presupuesto de `budget_ms` (RECOMMENDATION_TIME_BUDGET_MS): en
+    PostgreSQL cada consulta se corta con statement_timeout y, agotado el presupuesto, no se
+    ejecutan más fuentes y la lista se completa con los populares.
+
+    El respaldo de populares queda fuera del presupuesto: la verificación de la versión
+    publicada (como mucho cada RECOMMENDATION_RELOAD_INTERVAL segundos), el respaldo por
+    favoritos cuando no hay modelo y el filtro de productos activos son consultas por índice
+    que se ejecutan aunque el presupuesto ya se haya agotado.
+    """
+    budget_ms = settings.RECOMMENDATION_TIME_BUDGET_MS if budget_ms is None else budget_ms
+    deadline = time.monotonic() + budget_ms / 1000
+    excluded = {str(product_id)}
+    product_ids = []
+
+    try:
+        with transaction.atomic():
+            for source in (recommend_global_based_on_product, similar_product_ids):
+                remaining = deadline - time.monotonic()
+                if len(product_ids) >= top_n or remaining <= 0:
+                    break
+                _set_statement_timeout(remaining)
+                # Ambas fuentes ya excluyen los productos eliminados
+                product_ids += [
+                    str(related_id) for related_id in source(product_id, top_n)
+                    if str(related_id) not in excluded and str(related_id) not in product_ids
+                ]
+            _set_statement_timeout(None)
+    except DatabaseError:
+        # Una consulta superó el presupuesto (statement_timeout): se responde con los populares
+        product_ids = []
+
+    if len(product_ids) < top_n:
+        popular = [
+            popular_id for popular_id in recommend_products(top_n * 2)
+            if popular_id not in excluded and popular_id not in product_ids
+        ]
+        # El modelo publicado puede incluir productos eliminados después del entrenamiento
+        active = {
+            str(popular_id) for popular_id in
+            Product.objects.filter(id__in=popular, deleted_at__isnull=True).values_list('id', flat=True)
+        }
+        product_ids += [popular_id for popular_id in popular if popular_id in active][:top_n - len(product_ids)]
+    return product_ids[:top_n]
+
+
+def _set_statement_timeout(seconds):
+    """
+    Fija (o restablece con None) el statement_timeout de la transacción actual en PostgreSQL.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        if seconds is None:
+            cursor.execute('SET LOCAL statement_timeout TO DEFAULT')
+        else:
+            cursor.execute(f'SET LOCAL statement_timeout = {max(int(seconds * 1000), 1)}')
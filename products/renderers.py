@@ -0,0 +1,31 @@
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer que codifica con orjson cuando está instalado. Produce los mismos bytes que
+    JSONRenderer con la configuración por defecto (COMPACT_JSON y UNICODE_JSON, fechas y
+    decimales con el encoder de DRF); en otro caso, si se pide indentación o si orjson no está
+    instalado usa JSONRenderer.
+    """
+
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        if (orjson is None or data is None or not self.compact or self.ensure_ascii
+                or self.get_indent(accepted_media_type, renderer_context)):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        # Igual que JSONRenderer: escapar separadores de línea que no son válidos en JavaScript
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+# Renderers de los listados del catálogo (se mantiene la API navegable)
+CATALOG_RENDERERS = [FastJSONRenderer, BrowsableAPIRenderer]
@@ -0,0 +1,77 @@
+from django.db.models import Case, Count, F, FloatField, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+from .models import ProductReview, ProductReviewStats
+
+RATINGS = range(1, 6)
+
+
+def apply_review_change(product_id, rating, delta):
+    """
+    Suma (delta=1) o resta (delta=-1) una reseña de `rating` estrellas a las estadísticas del
+    producto con expresiones F y recalcula el promedio. Debe llamarse dentro de la misma
+    transacción que crea o borra la reseña.
+    """
+    changes = {
+        'review_count': F('review_count') + delta,
+        'rating_sum': F('rating_sum') + rating * delta,
+        f'rating_{rating}': F(f'rating_{rating}') + delta,
+        'modified_at': timezone.now(),
+    }
+    stats = ProductReviewStats.objects.filter(product_id=product_id)
+    if not stats.update(**changes):
+        ProductReviewStats.objects.bulk_create([ProductReviewStats(product_id=product_id)], ignore_conflicts=True)
+        stats.update(**changes)
+    stats.update(rating_average=average_expression())
+
+
+def average_expression():
+    return Case(
+        When(review_count__gt=0, then=Cast('rating_sum', FloatField()) / F('review_count')),
+        default=Value(0.0),
+        output_field=FloatField()
+    )
+
+
+def with_review_stats(products):
+    """
+    Anota `rating_average` y `review_count` (0 si el producto no tiene reseñas) leyendo las
+    estadísticas mantenidas, para ordenar y paginar sin agregar ProductReview.
+    """
+    return products.annotate(
+        rating_average=Coalesce('review_stats__rating_average', Value(0.0), output_field=FloatField()),
+        review_count=Coalesce('review_stats__review_count', Value(0), output_field=IntegerField()),
+    )
+
+
+def serialize_review_stats(stats):
+    """
+    Representación de las estadísticas de reseñas de un producto (o vacías si no tiene).
+    """
+    if stats is None:
+        return {'count': 0, 'average': 0.0, 'histogram': {str(rating): 0 for rating in RATINGS}}
+    return {
+        'count': stats.review_count,
+        'average': round(stats.rating_average, 2),
+        'histogram': {str(rating): getattr(stats, f'rating_{rating}') for rating in RATINGS},
+    }
+
+
+def get_review_stats_by_product(product_ids):
+    """
+    Devuelve un diccionario product_id -> ProductReviewStats para varios productos en una consulta.
+    """
+    return {stats.product_id: stats for stats in ProductReviewStats.objects.filter(product_id__in=product_ids)}
+
+
+def count_reviews_by_product():
+    """
+    Calcula las estadísticas de todos los productos desde ProductReview con una consulta agrupada.
+    Devuelve product_id -> {campo: valor} con los mismos campos que ProductReviewStats.
+    """
+    rows = ProductReview.objects.values('product_id').annotate(
+        review_count=Count('id'),
+        rating_sum=Sum('rating'),
+        **{f'rating_{rating}': Count('id', filter=Q(rating=rating)) for rating in RATINGS}
+    )
+    return {row.pop('product_id'): row for row in rows}
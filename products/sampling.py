@@ -0,0 +1,53 @@
+import random
+import uuid
+from .models import Product
+
+
+def sample_product_ids(n=4, category=None):
+    """
+    Devuelve hasta `n` IDs de productos activos elegidos al azar sin ordenar toda la tabla.
+
+    Los IDs son UUID4, distribuidos uniformemente, así que se sortea un UUID como pivote y se
+    toma el primer producto con id >= pivote usando el índice de la clave primaria (o el índice
+    (category, id) si se filtra por categoría). Cada muestra cuesta una búsqueda O(log n) en el
+    índice y funciona igual en cualquier base de datos.
+    """
+    products = Product.objects.filter(deleted_at__isnull=True)
+    if category:
+        products = products.filter(category=category)
+
+    picked = []
+    for _ in range(n * 3):
+        if len(picked) >= n:
+            break
+        product_id = _first_after_pivot(products)
+        if product_id is None:
+            break
+        if product_id not in picked:
+            picked.append(product_id)
+
+    if len(picked) < n:
+        # Catálogos chicos: completar con los siguientes productos después de un pivote
+        missing = products.exclude(id__in=picked)
+        pivot = _random_pivot()
+        picked += list(missing.filter(id__gte=pivot).order_by('id').values_list('id', flat=True)[:n - len(picked)])
+        picked += list(missing.filter(id__lt=pivot).order_by('id').values_list('id', flat=True)[:n - len(picked)])
+    return picked
+
+
+def _random_pivot():
+    return uuid.UUID(int=random.getrandbits(128))
+
+
+def _first_after_pivot(products):
+    product_id = products.filter(id__gte=_random_pivot()).order_by('id').values_list('id', flat=True).first()
+    if product_id is None:
+        # Se pasó del último ID: vuelve al principio
+        product_id = products.order_by('id').values_list('id', flat=True).first()
+    return product_id
+
+
+def sample_products(n=4, category=None):
+    product_ids = sample_product_ids(n, category)
+    products = {product.id: product for product in Product.objects.filter(id__in=product_ids)}
+    return [products[product_id] for product_id in product_ids if product_id in products]
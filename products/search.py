@@ -0,0 +1,226 @@
+import math
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Case, Count, F, FloatField, Max, Q, Value, When
+from django.db.models.functions import Greatest
+from .models import Product
+
+# Peso de cada campo en el ranking (el nombre pesa más que categoría y marca)
+FIELD_WEIGHTS = {'name': 1.0, 'category': 0.4, 'brand': 0.4}
+
+
+def product_search_vector():
+    return (
+        SearchVector('name', weight='A', config='simple') +
+        SearchVector('category', weight='B', config='simple') +
+        SearchVector('brand', weight='B', config='simple')
+    )
+
+
+class PostgresSearchBackend:
+    """
+    Búsqueda sobre la columna tsvector `search_vector` (índice GIN) combinada con
+    similitud de trigramas (índices gin_trgm_ops) para tolerar errores de tipeo.
+    """
+
+    def search(self, query, queryset):
+        search_query = SearchQuery(query, config='simple', search_type='websearch')
+        return queryset.annotate(
+            rank=SearchRank(F('search_vector'), search_query) + Greatest(
+                TrigramWordSimilarity(query, 'name'),
+                TrigramWordSimilarity(query, 'category') * FIELD_WEIGHTS['category'],
+                TrigramWordSimilarity(query, 'brand') * FIELD_WEIGHTS['brand'],
+            )
+        ).filter(
+            Q(search_vector=search_query) |
+            Q(name__trigram_word_similar=query) |
+            Q(category__trigram_word_similar=query) |
+            Q(brand__trigram_word_similar=query)
+        ).order_by('-rank', 'id')
+
+    def index_product(self, product):
+        vector = None if product.deleted_at else product_search_vector()
+        Product.objects.filter(pk=product.pk).update(search_vector=vector)
+
+    def index_products(self, products):
+        Product.objects.filter(pk__in=[product.pk for product in products], deleted_at__isnull=True) \
+            .update(search_vector=product_search_vector())
+
+
+class InMemorySearchBackend:
+    """
+    Índice invertido en memoria para bases de datos sin búsqueda de texto completo (SQLite).
+    El índice se construye en la primera búsqueda y se mantiene con index_product; si los
+    productos cambian por otra vía (otro proceso, el ORM directamente) se reconstruye al
+    detectar que cambió la firma del catálogo. Solo es adecuado para tests y desarrollo.
+    """
+
+    similarity_threshold = 0.3
+    prefix_similarity = 0.9
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = None
+        self._trigrams = None
+        self._product_tokens = None
+        self._signature = None
+
+    def search(self, query, queryset):
+        scores = self._score(query)
+        if not scores:
+            return queryset.annotate(rank=Value(0.0, output_field=FloatField())).none()
+
+        max_results = getattr(settings, 'PRODUCT_SEARCH_FALLBACK_MAX_RESULTS', 1000)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], str(item[0])))[:max_results]
+        return queryset.filter(id__in=[product_id for product_id, _ in ranked]).annotate(
+            rank=Case(
+                *[When(id=product_id, then=Value(score)) for product_id, score in ranked],
+                output_field=FloatField()
+            )
+        ).order_by('-rank', 'id')
+
+    def index_product(self, product):
+        with self._lock:
+            if self._postings is None:
+                return
+            self._remove(product.id)
+            if not product.deleted_at:
+                self._add(product.id, product.name, product.category, product.brand)
+            self._signature = catalog_signature()
+
+    def index_products(self, products):
+        with self._lock:
+            if self._postings is None:
+                return
+            for product in products:
+                self._remove(product.id)
+                if not product.deleted_at:
+                    self._add(product.id, product.name, product.category, product.brand)
+            self._signature = catalog_signature()
+
+    def _ensure_index(self):
+        signature = catalog_signature()
+        with self._lock:
+            if self._postings is not None and self._signature == signature:
+                return
+            self._signature = signature
+            self._postings = defaultdict(dict)
+            self._trigrams = defaultdict(set)
+            self._product_tokens = {}
+            rows = Product.objects.filter(deleted_at__isnull=True).values_list('id', 'name', 'category', 'brand')
+            for product_id, name, category, brand in rows.iterator(chunk_size=2000):
+                self._add(product_id, name, category, brand)
+
+    def _add(self, product_id, name, category, brand):
+        tokens = {}
+        for field, value in (('name', name), ('category', category), ('brand', brand)):
+            for token in tokenize(value):
+                tokens[token] = max(tokens.get(token, 0), FIELD_WEIGHTS[field])
+        for token, weight in tokens.items():
+            if token not in self._postings:
+                for trigram in trigrams(token):
+                    self._trigrams[trigram].add(token)
+            self._postings[token][product_id] = weight
+        self._product_tokens[product_id] = list(tokens)
+
+    def _remove(self, product_id):
+        for token in self._product_tokens.pop(product_id, []):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[token]
+                for trigram in trigrams(token):
+                    self._trigrams[trigram].discard(token)
+
+    def _score(self, query):
+        self._ensure_index()
+        with self._lock:
+            total_products = max(len(self._product_tokens), 1)
+            scores = defaultdict(float)
+            for query_token in set(tokenize(query)):
+                best = {}
+                for token, similarity in self._candidate_tokens(query_token):
+                    postings = self._postings[token]
+                    idf = math.log(1 + total_products / len(postings))
+                    for product_id, weight in postings.items():
+                        score = weight * similarity * idf
+                        if score > best.get(product_id, 0):
+                            best[product_id] = score
+                for product_id, score in best.items():
+                    scores[product_id] += score
+            return scores
+
+    def _candidate_tokens(self, query_token):
+        if query_token in self._postings:
+            yield query_token, 1.0
+
+        query_trigrams = trigrams(query_token)
+        shared = defaultdict(int)
+        for trigram in query_trigrams:
+            for token in self._trigrams.get(trigram, ()):
+                shared[token] += 1
+
+        for token, count in shared.items():
+            if token == query_token:
+                continue
+            if token.startswith(query_token):
+                yield token, self.prefix_similarity
+                continue
+            similarity = count / len(query_trigrams | trigrams(token))
+            if similarity >= self.similarity_threshold:
+                yield token, similarity
+
+
+def catalog_signature():
+    return Product.objects.filter(deleted_at__isnull=True).aggregate(count=Count('id'), modified=Max('modified_at'))
+
+
+def tokenize(text):
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii').lower()
+    return re.findall(r'[a-z0-9]+', text)
+
+
+def trigrams(token):
+    padded = f'  {token} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+_backends = {}
+
+
+def get_search_backend():
+    """
+    Devuelve el backend de búsqueda adecuado para la base de datos configurada.
+    """
+    vendor = connection.vendor
+    if vendor not in _backends:
+        _backends[vendor] = PostgresSearchBackend() if vendor == 'postgresql' else InMemorySearchBackend()
+    return _backends[vendor]
+
+
+def search_catalog(query, queryset=None):
+    """
+    Devuelve `queryset` filtrado a los productos que coinciden con `query`,
+    anotado con `rank` y ordenado por relevancia.
+    """
+    if queryset is None:
+        queryset = Product.objects.filter(deleted_at__isnull=True)
+    return get_search_backend().search(query, queryset)
+
+
+def index_product(product):
+    get_search_backend().index_product(product)
+
+
+def index_products(products):
+    """
+    Indexa varios productos nuevos a la vez (una sola actualización en PostgreSQL).
+    """
+    get_search_backend().index_products(products)
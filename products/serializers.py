@@ -1,6 +1,37 @@
 from rest_framework import serializers
-from .models import Product, Tag, ProductReview, Stock, Tagged
-from django.db.models import Sum
+from .models import Product, Tag, ProductReview, Tagged
+from .stock import get_stock_total, get_stock_totals
+from .reviews import get_review_stats_by_product, serialize_review_stats
+from django.db.models import Prefetch, prefetch_related_objects
+from django.db.models.manager import BaseManager
+
+
+def prefetch_product_relations(products):
+    """
+    Carga tags, las últimas 5 reseñas, sus estadísticas y el stock total de una lista de productos
+    en un número constante de consultas y los deja en cada instancia para
+    que ProductSerializer no consulte la base de datos por producto.
+    """
+    products = [product for product in products if not hasattr(product, 'prefetched_total_stock')]
+    if not products:
+        return
+
+    prefetch_related_objects(
+        products,
+        Prefetch('tagged_set', queryset=Tagged.objects.select_related('tag'), to_attr='prefetched_tagged'),
+        Prefetch(
+            'productreview_set',
+            queryset=ProductReview.objects.order_by('-created_at')[:5],  # últimas 5 por producto
+            to_attr='prefetched_previews'
+        ),
+    )
+
+    product_ids = [product.id for product in products]
+    stock_totals = get_stock_totals(product_ids)
+    review_stats = get_review_stats_by_product(product_ids)
+    for product in products:
+        product.prefetched_total_stock = stock_totals.get(product.id) or 0
+        product.prefetched_review_stats = review_stats.get(product.id)
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -15,27 +46,54 @@ class ProductReviewPreviewSerializer(serializers.ModelSerializer):
         fields = ['id', 'rating', 'comment', 'created_at']
 
 
+class ProductListSerializer(serializers.ListSerializer):
+    """
+    Serializa listas de productos cargando sus relaciones por lotes.
+    """
+
+    def to_representation(self, data):
+        products = list(data.all() if isinstance(data, BaseManager) else data)
+        prefetch_product_relations(products)
+        return [self.child.to_representation(product) for product in products]
+
+
 class ProductSerializer(serializers.ModelSerializer):
     tags = serializers.SerializerMethodField()
     previews = serializers.SerializerMethodField()
     favorite_count = serializers.IntegerField(read_only=True)
     total_stock = serializers.SerializerMethodField()
+    review_stats = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
-        fields = '__all__'
+        exclude = ['search_vector']
+        list_serializer_class = ProductListSerializer
 
     def get_tags(self, obj):
-        tags = Tag.objects.filter(tagged__product=obj)
+        if hasattr(obj, 'prefetched_tagged'):
+            tags = [tagged.tag for tagged in obj.prefetched_tagged]
+        else:
+            tags = Tag.objects.filter(tagged__product=obj)
         return TagSerializer(tags, many=True).data
 
     def get_previews(self, obj):
-        reviews = ProductReview.objects.filter(product=obj).order_by('-created_at')[:5]  # últimas 5
+        if hasattr(obj, 'prefetched_previews'):
+            reviews = obj.prefetched_previews
+        else:
+            reviews = ProductReview.objects.filter(product=obj).order_by('-created_at')[:5]  # últimas 5
         return ProductReviewPreviewSerializer(reviews, many=True).data
 
     def get_total_stock(self, obj):
-        total = Stock.objects.filter(product=obj).aggregate(total=Sum('quantity'))['total']
-        return total or 0
+        if hasattr(obj, 'prefetched_total_stock'):
+            return obj.prefetched_total_stock
+        return get_stock_total(obj.id)
+
+    def get_review_stats(self, obj):
+        if hasattr(obj, 'prefetched_review_stats'):
+            stats = obj.prefetched_review_stats
+        else:
+            stats = get_review_stats_by_product([obj.id]).get(obj.id)
+        return serialize_review_stats(stats)
 
 
 class ProductSerializer2(serializers.ModelSerializer):
@@ -51,7 +109,7 @@ class ProductSerializer2(serializers.ModelSerializer):
         return [tag.name for tag in tags]
 
     def get_stock(self, obj):
-        return Stock.objects.filter(product=obj).aggregate(total=Sum('quantity'))['total'] or 0
+        return get_stock_total(obj.id)
 
 
 class TagSerializer2(serializers.ModelSerializer):
@@ -0,0 +1,85 @@
+from django.db import transaction
+from .models import ProductSimilarity
+from .recomendation import get_product_feature_matrix
+
+
+def similarity_vectors(features):
+    """
+    Escala cada columna de la matriz de features (sin centrar, para conservarla dispersa) y
+    normaliza cada fila a norma 1, de modo que la similitud coseno sea el producto punto.
+    """
+    from sklearn.preprocessing import StandardScaler, normalize
+
+    scaled = StandardScaler(with_mean=False).fit_transform(features.matrix)
+    return normalize(scaled, norm='l2', copy=False)
+
+
+def nearest_neighbors(vectors, n_neighbors, rows, batch_size=1000):
+    """
+    Devuelve (fila, [(fila vecina, similitud)]) para cada fila de `rows`, excluyendo la propia
+    fila. La búsqueda es exacta (coseno por fuerza bruta) y se hace por lotes para acotar memoria.
+    """
+    from sklearn.neighbors import NearestNeighbors
+
+    n_neighbors = min(n_neighbors + 1, vectors.shape[0])
+    model = NearestNeighbors(n_neighbors=n_neighbors, metric='cosine', algorithm='brute').fit(vectors)
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        distances, neighbors = model.kneighbors(vectors[batch])
+        for row, row_distances, row_neighbors in zip(batch, distances, neighbors):
+            yield row, [
+                (int(neighbor), round(1 - float(distance), 6))
+                for neighbor, distance in zip(row_neighbors, row_distances)
+                if neighbor != row
+            ][:n_neighbors - 1]
+
+
+def rebuild_product_similarity(n_neighbors=10, product_ids=None, batch_size=1000):
+    """
+    Recalcula los `n_neighbors` productos más similares por contenido (precio, categoría, marca
+    y tags). Sin `product_ids` reemplaza toda la tabla ProductSimilarity; con `product_ids` solo
+    recalcula las filas de esos productos (p. ej. productos nuevos). Devuelve las filas creadas.
+    """
+    features = get_product_feature_matrix()
+    if len(features.product_ids) < 2:
+        return 0
+
+    if product_ids is None:
+        rows = list(range(len(features.product_ids)))
+    else:
+        rows = [features.index[str(product_id)] for product_id in product_ids if str(product_id) in features.index]
+
+    vectors = similarity_vectors(features)
+    created = 0
+    with transaction.atomic():
+        if product_ids is None:
+            ProductSimilarity.objects.all().delete()
+        else:
+            ProductSimilarity.objects.filter(product_id__in=[features.product_ids[row] for row in rows]).delete()
+
+        batch = []
+        for row, neighbors in nearest_neighbors(vectors, n_neighbors, rows, batch_size):
+            batch += [
+                ProductSimilarity(
+                    product_id=features.product_ids[row],
+                    similar_product_id=features.product_ids[neighbor],
+                    score=score
+                )
+                for neighbor, score in neighbors
+            ]
+            if len(batch) >= batch_size:
+                created += len(ProductSimilarity.objects.bulk_create(batch))
+                batch = []
+        created += len(ProductSimilarity.objects.bulk_create(batch))
+    return created
+
+
+def similar_product_ids(product_id, top_n=6):
+    """
+    Devuelve los IDs de los productos activos más similares a `product_id` (búsqueda por índice).
+    """
+    return list(
+        ProductSimilarity.objects.filter(product_id=product_id, similar_product__deleted_at__isnull=True)
+        .order_by('-score', 'similar_product_id')
+        .values_list('similar_product_id', flat=True)[:top_n]
+    )
@@ -0,0 +1,46 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Stock, StockBalance
+
+
+def add_stock(product_id, quantity):
+    """
+    Registra un movimiento en el ledger de Stock y actualiza el saldo del producto
+    en la misma transacción. Devuelve la fila de Stock creada.
+    """
+    with transaction.atomic():
+        stock = Stock.objects.create(product_id=product_id, quantity=quantity)
+        apply_stock_delta(product_id, quantity)
+    return stock
+
+
+def apply_stock_delta(product_id, quantity):
+    """
+    Suma `quantity` al saldo del producto con una expresión F, creando el saldo si no existe.
+    """
+    updated = StockBalance.objects.filter(product_id=product_id).update(
+        quantity=F('quantity') + quantity,
+        modified_at=timezone.now()
+    )
+    if not updated:
+        StockBalance.objects.bulk_create([StockBalance(product_id=product_id, quantity=0)], ignore_conflicts=True)
+        StockBalance.objects.filter(product_id=product_id).update(
+            quantity=F('quantity') + quantity,
+            modified_at=timezone.now()
+        )
+
+
+def get_stock_total(product_id):
+    """
+    Devuelve el stock disponible de un producto leyendo su saldo materializado.
+    """
+    total = StockBalance.objects.filter(product_id=product_id).values_list('quantity', flat=True).first()
+    return total or 0
+
+
+def get_stock_totals(product_ids):
+    """
+    Devuelve un diccionario product_id -> stock disponible para varios productos en una consulta.
+    """
+    return dict(StockBalance.objects.filter(product_id__in=product_ids).values_list('product_id', 'quantity'))
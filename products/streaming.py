@@ -0,0 +1,81 @@
+from itertools import islice
+from types import GeneratorType
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from .lean import product_values_fields, serialize_product_rows
+from .renderers import FastJSONRenderer
+
+STREAM_FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def get_stream_format(request):
+    """
+    Devuelve el formato pedido con ?stream= (1 o json: arreglo JSON, ndjson: un objeto por línea)
+    o None si no se pidió streaming.
+    """
+    value = request.GET.get('stream', '').lower()
+    if value in ('1', 'true', 'json'):
+        return 'json'
+    if value == 'ndjson':
+        return 'ndjson'
+    return None
+
+
+def iter_products(queryset, chunk_size=None):
+    """
+    Recorre `queryset` con un cursor del lado del servidor (iterator) y serializa los productos
+    por bloques de `chunk_size` con el camino lean, así la memoria usada depende del tamaño del
+    bloque y no del catálogo.
+    """
+    chunk_size = chunk_size or settings.CATALOG_STREAM_CHUNK_SIZE
+    rows = queryset.values(*product_values_fields()).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield from serialize_product_rows(chunk)
+
+
+def stream_json_array(items):
+    """
+    Codifica `items` como un arreglo JSON emitiendo un fragmento por elemento.
+    """
+    renderer = FastJSONRenderer()
+    yield b'['
+    for position, item in enumerate(items):
+        yield (b',' if position else b'') + renderer.render(item)
+    yield b']'
+
+
+def stream_json_object(fields):
+    """
+    Codifica pares (clave, valor) como un objeto JSON; los valores que son generadores se
+    emiten como arreglos con stream_json_array y el resto se codifica de una vez.
+    """
+    renderer = FastJSONRenderer()
+    yield b'{'
+    for position, (key, value) in enumerate(fields):
+        yield (b',' if position else b'') + renderer.render(key) + b':'
+        if isinstance(value, GeneratorType):
+            yield from stream_json_array(value)
+        else:
+            yield renderer.render(value)
+    yield b'}'
+
+
+def stream_ndjson(items):
+    renderer = FastJSONRenderer()
+    for item in items:
+        yield renderer.render(item) + b'\n'
+
+
+def streaming_products_response(queryset, stream_format):
+    """
+    Respuesta con todos los productos de `queryset` (sin paginar) generada incrementalmente.
+    """
+    items = iter_products(queryset)
+    content = stream_ndjson(items) if stream_format == 'ndjson' else stream_json_array(items)
+    return StreamingHttpResponse(content, content_type=STREAM_FORMATS[stream_format])
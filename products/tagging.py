@@ -0,0 +1,60 @@
+import uuid
+from django.db import transaction
+from .models import Product, Tag, Tagged
+
+
+def parse_ids(values):
+    """
+    Convierte una lista de IDs a UUID; devuelve (válidos en orden sin repetir, inválidos).
+    """
+    valid, invalid = [], []
+    for value in values:
+        try:
+            valid.append(uuid.UUID(str(value)))
+        except ValueError:
+            invalid.append(value)
+    return list(dict.fromkeys(valid)), invalid
+
+
+def tag_products(product_ids, tag_ids, remove=False):
+    """
+    Asocia (o desasocia si `remove`) cada producto de `product_ids` con cada tag de `tag_ids`.
+
+    Resuelve productos, tags y relaciones existentes con una consulta cada uno y aplica los
+    cambios con un bulk_create(ignore_conflicts=True) o un único DELETE. Devuelve una lista con
+    el resultado de cada par: created, exists, removed, not_associated, product_not_found o tag_not_found.
+    """
+    products = set(Product.objects.filter(id__in=product_ids).values_list('id', flat=True))
+    tags = set(Tag.objects.filter(id__in=tag_ids).values_list('id', flat=True))
+
+    with transaction.atomic():
+        existing = set(
+            Tagged.objects.filter(product_id__in=products, tag_id__in=tags).values_list('product_id', 'tag_id')
+        )
+        if remove:
+            if existing:
+                Tagged.objects.filter(product_id__in=products, tag_id__in=tags).delete()
+        else:
+            Tagged.objects.bulk_create(
+                [
+                    Tagged(product_id=product_id, tag_id=tag_id)
+                    for product_id in product_ids if product_id in products
+                    for tag_id in tag_ids if tag_id in tags and (product_id, tag_id) not in existing
+                ],
+                batch_size=1000,
+                ignore_conflicts=True
+            )
+
+    results = []
+    for product_id in product_ids:
+        for tag_id in tag_ids:
+            if product_id not in products:
+                result = 'product_not_found'
+            elif tag_id not in tags:
+                result = 'tag_not_found'
+            elif remove:
+                result = 'removed' if (product_id, tag_id) in existing else 'not_associated'
+            else:
+                result = 'exists' if (product_id, tag_id) in existing else 'created'
+            results.append({'product_id': str(product_id), 'tag_id': str(tag_id), 'result': result})
+    return results
@@ -1,3 +1,460 @@
-from django.test import TestCase
+import itertools
+import time
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from django.core import checks
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from logs.models import ActivityLog
+from users.models import UserAccount
+from .favorites import add_favorite
+from .importtime import IMPORT_TIME_BUDGET_MS, heavy_modules, measure_imports, total_ms
+from .lean import serialize_products
+from .models import Product, ProductCooccurrence, ProductReview, StockBalance, Tag, Tagged, UserRecommendation
+from .renderers import FastJSONRenderer
+from . import recomendation
+from .recomendation import rebuild_product_cooccurrence
+from .related import recommend_for_product
+from .personalization import top_products_by_user, train_user_recommendations
+from .reviews import apply_review_change
+from .sampling import sample_product_ids
+from .serializers import ProductSerializer
+from .similarity import rebuild_product_similarity
+from .stock import add_stock
 
-# Create your tests here.
+
+def create_user(email, role=UserAccount.RoleChoices.CLIENT):
+    return UserAccount.objects.create(
+        name='Test', email=email, password='-', cellphone='0', birth_date='2000-01-01', gender='-', role=role
+    )
+
+
+def create_products(count, tags, reviewer, start=0):
+    """
+    Crea `count` productos con tags, reseñas, stock y favoritos, como los del catálogo real.
+    """
+    products = []
+    for i in range(start, start + count):
+        product = Product.objects.create(
+            name=f'Producto {i}', price=Decimal('10.50') + i, specification='-',
+            category=f'cat{i % 3}', photo='-', brand=f'brand{i % 4}'
+        )
+        for tag in tags[:i % len(tags) + 1]:
+            Tagged.objects.create(tag=tag, product=product)
+        for rating in range(1, i % 5 + 2):
+            ProductReview.objects.create(product=product, user=reviewer, rating=rating, comment='-')
+            apply_review_change(product.id, rating, 1)
+        add_stock(product.id, 5 + i)
+        if i % 2:
+            add_favorite(reviewer, product)
+        products.append(product)
+    return products
+
+
+class CatalogQueryCountTests(TestCase):
+    """
+    Los listados del catálogo cargan tags, reseñas y stock por lotes: la cantidad de consultas
+    de cada página no depende de cuántos productos ni relaciones tenga.
+    """
+    page_size = 5
+
+    def setUp(self):
+        cache.clear()
+        self.admin = create_user('admin@test.com', UserAccount.RoleChoices.ADMIN)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.tags = [Tag.objects.create(name=f'tag{i}') for i in range(4)]
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content[:300])
+        return len(context.captured_queries), response.json()
+
+    def assert_pages_use_same_queries(self, url):
+        separator = '&' if '?' in url else '?'
+        url = f'{url}{separator}page_size={self.page_size}'
+
+        create_products(self.page_size, self.tags, self.admin)
+        self.count_queries(url)
+        expected, _ = self.count_queries(url)
+
+        # La primera búsqueda después de cambiar el catálogo reconstruye el índice en memoria
+        # del backend de SQLite; se descarta para medir solo las consultas de la página
+        create_products(self.page_size * 3, self.tags, self.admin, start=self.page_size)
+        self.count_queries(url)
+        cursor, pages = None, 0
+        while True:
+            page_url = f'{url}&cursor={cursor}' if cursor else url
+            queries, data = self.count_queries(page_url)
+            self.assertEqual(queries, expected, f'{page_url} ejecutó {queries} consultas en lugar de {expected}')
+            self.assertTrue(data['results'])
+            pages += 1
+            cursor = data['next']
+            if not cursor:
+                break
+        self.assertEqual(pages, 4)
+
+    def test_product_list(self):
+        self.assert_pages_use_same_queries('/products/')
+
+    def test_search_product(self):
+        self.assert_pages_use_same_queries('/products/searchProducts?ordering=-rating_average')
+
+    def test_search_product_by_text(self):
+        self.assert_pages_use_same_queries('/products/searchProducts?q=Producto&ordering=name')
+
+    def test_most_favorited_products(self):
+        self.assert_pages_use_same_queries('/products/favoritesmost')
+
+
+class StockBalanceTests(TestCase):
+    def rebuild(self, *args):
+        out = StringIO()
+        call_command('rebuild_stock_balances', *args, stdout=out)
+        return out.getvalue()
+
+    def test_products_without_stock_are_not_drift(self):
+        Product.objects.create(name='Sin stock', price=Decimal('1.00'), specification='-', category='c', photo='-', brand='b')
+        self.assertIn('coinciden', self.rebuild('--verify'))
+
+    def test_drift_is_corrected(self):
+        product = Product.objects.create(name='P', price=Decimal('1.00'), specification='-', category='c', photo='-', brand='b')
+        add_stock(product.id, 7)
+        StockBalance.objects.filter(product=product).update(quantity=2)
+        self.assertIn('1 saldos corregidos', self.rebuild())
+        self.assertEqual(StockBalance.objects.get(product=product).quantity, 7)
+
+
+class ProductImportTests(TestCase):
+    def upload(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        upload = SimpleUploadedFile(
+            'productos.csv', b'name,price,specification,category,photo,brand,stock\nNuevo,10.00,-,c,-,b,3\n'
+        )
+        return client.post('/products/import', {'file': upload}, format='multipart')
+
+    def test_clients_cannot_import(self):
+        response = self.upload(create_user('client@test.com'))
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Product.objects.exists())
+
+    def test_admin_import(self):
+        response = self.upload(create_user('admin@test.com', UserAccount.RoleChoices.ADMIN))
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json(), {'created': 1, 'errors': []})
+
+
+class BulkTagTests(TestCase):
+    def setUp(self):
+        self.products = [
+            Product.objects.create(name=f'P{i}', price=Decimal('1.00'), specification='-', category='c', photo='-', brand='b')
+            for i in range(3)
+        ]
+        self.tags = [Tag.objects.create(name=f'tag{i}') for i in range(2)]
+
+    def bulk_tag(self, user, action):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post('/products/tags/bulk', {
+            'product_ids': [str(product.id) for product in self.products],
+            'tag_ids': [str(tag.id) for tag in self.tags],
+            'action': action
+        }, format='json')
+
+    def test_clients_cannot_bulk_tag(self):
+        client = create_user('client@test.com')
+        for action in ('add', 'remove'):
+            self.assertEqual(self.bulk_tag(client, action).status_code, 403)
+        self.assertFalse(Tagged.objects.exists())
+
+    def test_one_log_entry_per_tag(self):
+        Tagged.objects.create(product=self.products[0], tag=self.tags[0])
+        response = self.bulk_tag(create_user('admin@test.com', UserAccount.RoleChoices.ADMIN), 'add')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['changed'], 5)
+        self.assertEqual(Tagged.objects.count(), 6)
+        logs = ActivityLog.objects.filter(type='tag')
+        self.assertEqual(sorted(log.entity_id for log in logs), sorted(tag.id for tag in self.tags))
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost'}}
+
+    def check_ids(self, deploy=False):
+        return [message.id for message in checks.run_checks(tags=[checks.Tags.caches], include_deployment_checks=deploy)]
+
+    def test_locmem_with_several_workers_is_an_error(self):
+        with override_settings(CACHES=self.locmem, WEB_CONCURRENCY=4):
+            self.assertIn('products.E001', self.check_ids())
+        with override_settings(CACHES=self.locmem, WEB_CONCURRENCY=1):
+            self.assertNotIn('products.E001', self.check_ids())
+            self.assertIn('products.W001', self.check_ids(deploy=True))
+        with override_settings(CACHES=self.redis, WEB_CONCURRENCY=4):
+            self.assertEqual(self.check_ids(deploy=True), [])
+
+
+class SamplingTests(TestCase):
+    def test_small_catalogs_fill_up_to_n(self):
+        products = [
+            Product.objects.create(name=f'P{i}', price=Decimal('1.00'), specification='-', category='c', photo='-', brand='b')
+            for i in range(4)
+        ]
+        products[3].deleted_at = timezone.now()
+        products[3].save()
+        active = {product.id for product in products[:3]}
+        for _ in range(20):
+            picked = sample_product_ids(3)
+            self.assertEqual(len(picked), 3)
+            self.assertEqual(set(picked), active)
+        self.assertEqual(set(sample_product_ids(5, category='c')), active)
+
+
+class SimilarProductsTests(TestCase):
+    def test_similar_products_index(self):
+        rows = [('10.00', 'a', 'x'), ('11.00', 'a', 'x'), ('500.00', 'b', 'y'), ('10.00', 'a', 'x'), ('12.00', 'a', 'y')]
+        products = [
+            Product.objects.create(name=f'P{i}', price=Decimal(price), specification='-', category=category, photo='-', brand=brand)
+            for i, (price, category, brand) in enumerate(rows)
+        ]
+        self.assertEqual(rebuild_product_similarity(n_neighbors=4), 20)
+        products[3].deleted_at = timezone.now()
+        products[3].save()
+
+        response = APIClient().get(f'/products/similar/{products[0].id}')
+        self.assertEqual(response.status_code, 200)
+        similar = [product['id'] for product in response.json()['similar_products']]
+        self.assertEqual(similar, [str(products[i].id) for i in (1, 4, 2)])
+
+    def test_unknown_product(self):
+        response = APIClient().get('/products/similar/00000000-0000-4000-8000-000000000000')
+        self.assertEqual(response.status_code, 404)
+
+
+class TopProductsByUserTests(SimpleTestCase):
+    def test_excludes_seen_and_excluded_products(self):
+        import numpy as np
+        from scipy import sparse
+
+        matrix = sparse.csr_matrix(np.array([[1, 0, 0, 0, 0], [0, 0, 1, 0, 0]], dtype=np.float64))
+        users = np.array([[1.0], [-1.0]], dtype=np.float32)
+        products = np.array([[0.5, 0.9, 0.3, 0.7, -0.2]], dtype=np.float32)
+
+        result = dict(top_products_by_user(matrix, (users, products), [3], top_n=3, batch_size=1))
+        # Usuario 0: ya tiene la columna 0 y la 3 está excluida; los scores negativos se descartan
+        self.assertEqual([column for column, _ in result[0]], [1, 2])
+        self.assertEqual([round(score, 6) for _, score in result[0]], [0.9, 0.3])
+        self.assertEqual([column for column, _ in result[1]], [4])
+
+
+class UserRecommendationTests(TestCase):
+    def setUp(self):
+        # Dos grupos de 4 productos; cada usuario marcó como favoritos los de su grupo menos uno
+        self.products = [
+            Product.objects.create(name=f'P{i}', price=Decimal('10.00'), specification='-', category='c', photo='-', brand='b')
+            for i in range(8)
+        ]
+        self.users = [create_user(f'user{i}@test.com') for i in range(8)]
+        for i, user in enumerate(self.users):
+            group = self.products[i // 4 * 4:i // 4 * 4 + 4]
+            for product in group:
+                if product is not group[i % 4]:
+                    add_favorite(user, product)
+        add_favorite(create_user('fan@test.com'), self.products[5])
+        self.deleted = self.products[3]
+        self.deleted.deleted_at = timezone.now()
+        self.deleted.save()
+
+    def test_train_user_recommendations(self):
+        created = train_user_recommendations(n_factors=4, top_n=3)
+        self.assertGreater(created, 0)
+        self.assertEqual(UserRecommendation.objects.count(), created)
+        for user in self.users:
+            recommended = list(
+                UserRecommendation.objects.filter(user=user).order_by('-score').values_list('product_id', 'score')
+            )
+            seen = set(user.favoriteproduct_set.values_list('product_id', flat=True))
+            self.assertFalse({product_id for product_id, _ in recommended} & (seen | {self.deleted.id}))
+            scores = [score for _, score in recommended]
+            self.assertTrue(all(score > 0 for score in scores))
+            self.assertEqual(scores, sorted(scores, reverse=True))
+            self.assertLessEqual(len(recommended), 3)
+
+    def test_users_without_recommendations_get_popular_products(self):
+        train_user_recommendations(n_factors=4, top_n=3)
+        client = APIClient()
+        client.force_authenticate(create_user('new@test.com'))
+        published = {'version': None, 'product_ids': [], 'checked_at': time.monotonic()}
+        with mock.patch.dict(recomendation._published_model, published):
+            response = client.get('/products/recommended/me?limit=3')
+        self.assertEqual(response.status_code, 200)
+        product_ids = [product['id'] for product in response.json()]
+        self.assertEqual(len(product_ids), 3)
+        self.assertEqual(product_ids[0], str(self.products[5].id))
+        self.assertNotIn(str(self.deleted.id), product_ids)
+
+
+class BenchmarkRecommendationsTests(TestCase):
+    def benchmark(self, *args):
+        out = StringIO()
+        call_command('benchmark_recommendations', '--interactions', '500', '--queries', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def test_refuses_databases_with_data(self):
+        Product.objects.create(name='P', price=Decimal('1.00'), specification='-', category='c', photo='-', brand='b')
+        with self.assertRaisesMessage(CommandError, '--allow-existing-data'):
+            self.benchmark()
+        self.assertEqual(Product.objects.count(), 1)
+
+    def test_datasets_are_rolled_back(self):
+        output = self.benchmark()
+        self.assertIn('train_user_recommendations', output)
+        self.assertFalse(Product.objects.exists())
+
+
+class ProductFeatureMatrixTests(SimpleTestCase):
+    def test_duplicate_tag_names_are_one_hot(self):
+        from .recomendation import build_product_feature_matrix
+
+        features = build_product_feature_matrix(
+            [('p1', Decimal('20.00'), 'cat', 'brand'), ('p2', Decimal('5.00'), 'cat', 'brand')],
+            [('p1', 'oferta'), ('p1', 'oferta'), ('p2', 'oferta')]
+        )
+        matrix = features.matrix.toarray()
+        column = features.feature_names.index('tag_oferta')
+        self.assertEqual(list(matrix[:, column]), [1.0, 1.0])
+        self.assertEqual(list(matrix[:, 0]), [20.0, 5.0])
+
+
+class LeanSerializationTests(TestCase):
+    def test_same_bytes_as_product_serializer(self):
+        reviewer = create_user('reviewer@test.com')
+        tags = [Tag.objects.create(name='Oferta'), Tag.objects.create(name='Café ☕')]
+        products = create_products(3, tags, reviewer)
+        products += [
+            Product.objects.create(
+                name='Ñandú — edición «especial» 日本\u2028', price=Decimal('1999.99'), specification='Línea\nnueva',
+                category='Accesorios', photo='-', brand='Müller'
+            ),
+            Product.objects.create(
+                name='Sin reseñas', price=Decimal('0.10'), specification='-', category='x', photo='-', brand='y'
+            ),
+        ]
+        for rating in (5, 4, 4):
+            ProductReview.objects.create(product=products[3], user=reviewer, rating=rating, comment='¡Muy bueno! 👍')
+            apply_review_change(products[3].id, rating, 1)
+        product_ids = [product.id for product in products]
+
+        ordered = sorted(Product.objects.filter(id__in=product_ids), key=lambda product: product_ids.index(product.id))
+        serializer_bytes = JSONRenderer().render(ProductSerializer(ordered, many=True).data)
+        lean_bytes = FastJSONRenderer().render(serialize_products(product_ids))
+        self.assertEqual(lean_bytes, serializer_bytes)
+
+
+class ImportTimeTests(SimpleTestCase):
+    """
+    Arranque en frío de un worker de la API: importar las vistas (cart.views importa
+    products.views) no debe cargar las librerías científicas ni superar el presupuesto.
+    """
+
+    def test_cold_start(self):
+        imports = measure_imports('cart.views', runs=3)
+        self.assertEqual(heavy_modules(imports), [])
+        self.assertLessEqual(total_ms(imports), IMPORT_TIME_BUDGET_MS)
+
+
+@override_settings(COOCCURRENCE_WEIGHTS={'favorites': 2, 'cart': 0.5, 'orders': 3}, COOCCURRENCE_TOP_K=0)
+class CooccurrenceTests(TestCase):
+    def setUp(self):
+        self.products = [
+            Product.objects.create(name=f'P{i}', price=Decimal('10.00'), specification='-', category='c', photo='-', brand='b')
+            for i in range(60)
+        ]
+
+    def snapshot(self):
+        return {
+            (product_id, related_id): round(score, 6) for product_id, related_id, score in
+            ProductCooccurrence.objects.values_list('product_id', 'related_product_id', 'score')
+        }
+
+    def interact(self):
+        products = self.products
+        for n in range(3):
+            client = APIClient()
+            client.force_authenticate(create_user(f'user{n}@test.com'))
+            for product in products[n:n + 55]:
+                self.assertEqual(client.post(f'/products/favorites/add/{product.id}').status_code, 201)
+            for product in products[n + 2:n + 6]:
+                response = client.post('/cart/addproduct?recommendations=0', {'product_id': str(product.id)}, format='json')
+                self.assertEqual(response.status_code, 200, response.content)
+            client.delete(f'/products/favorites/remove/{products[n].id}')
+            client.delete('/cart/removeproduct', {'product_id': str(products[n + 2].id)}, format='json')
+
+    def test_incremental_updates_match_rebuild(self):
+        self.interact()
+        incremental = self.snapshot()
+        rebuild_product_cooccurrence()
+        self.assertEqual(incremental, self.snapshot())
+
+    @override_settings(COOCCURRENCE_TOP_K=5)
+    def test_table_is_capped_to_top_k(self):
+        self.interact()
+        # Las bajas pueden dejar menos de 5 pares en algunos productos, nunca más
+        counts = ProductCooccurrence.objects.values('product_id').annotate(total=Count('id'))
+        self.assertEqual(max(row['total'] for row in counts), 5)
+
+        rebuild_product_cooccurrence(top_k=0)
+        full = self.snapshot()
+        rebuild_product_cooccurrence()
+        capped = self.snapshot()
+        for product in self.products:
+            top = sorted((score for (product_id, _), score in full.items() if product_id == product.id), reverse=True)[:5]
+            kept = sorted((score for (product_id, _), score in capped.items() if product_id == product.id), reverse=True)
+            self.assertEqual(kept, top)
+
+
+class RelatedProductsTests(TestCase):
+    def test_popular_fallback_skips_deleted_products(self):
+        products = [
+            Product.objects.create(name=f'P{i}', price=Decimal('10.00'), specification='-', category='c', photo='-', brand='b')
+            for i in range(4)
+        ]
+        products[1].deleted_at = timezone.now()
+        products[1].save()
+        published = {
+            'version': 1, 'product_ids': [str(product.id) for product in products], 'checked_at': time.monotonic()
+        }
+
+        with mock.patch.dict(recomendation._published_model, published):
+            # Sin presupuesto la lista sale completa del respaldo de populares
+            related = recommend_for_product(products[0].id, top_n=3, budget_ms=0)
+        self.assertEqual(related, [str(products[2].id), str(products[3].id)])
+
+    def test_exhausted_budget_skips_deleted_cooccurrences(self):
+        products = [
+            Product.objects.create(name=f'P{i}', price=Decimal('10.00'), specification='-', category='c', photo='-', brand='b')
+            for i in range(4)
+        ]
+        products[1].deleted_at = timezone.now()
+        products[1].save()
+        for related, score in ((products[1], 5), (products[2], 3)):
+            ProductCooccurrence.objects.create(product=products[0], related_product=related, score=score)
+        published = {'version': 1, 'product_ids': [str(products[3].id)], 'checked_at': time.monotonic()}
+
+        # El presupuesto se agota justo después de la consulta de co-ocurrencias
+        clock = mock.Mock(monotonic=mock.Mock(side_effect=itertools.chain([0, 0], itertools.repeat(1))))
+        with mock.patch.dict(recomendation._published_model, published), mock.patch('products.related.time', clock):
+            related = recommend_for_product(products[0].id, top_n=2, budget_ms=150)
+        self.assertEqual(related, [str(products[2].id), str(products[3].id)])
@@ -4,13 +4,16 @@ from . import views
 urlpatterns = [
     path('', views.product_list, name='api-product-list'),
     path('registerProduct', views.register_product, name='api-product-register'),
+    path('import', views.import_products_file, name='api-product-import'),
     path('search', views.search_products, name='search-products'),
+    path('search/facets', views.search_facets, name='search-facets'),
     path('searchProducts', views.search_product, name='search-products'),
     path('categories', views.get_product_categories, name='get-product-categories'),
     path('tags/create', views.create_tag, name='create-tag'),
     path('tags/delete/<uuid:tag_id>', views.delete_tag, name='delete-tag'),
     path('tags/associate', views.associate_tag_to_product, name='associate-tag-product'),
     path('tags/remove', views.remove_tag_from_product, name='remove-tag-product'),
+    path('tags/bulk', views.bulk_tag_products, name='bulk-tag-products'),
     path('tags/product/<uuid:product_id>', views.get_tags_for_product, name='get-tags-product'),
     path('tags', views.get_tags, name='get-tags'),
     path('reviews/create/<uuid:product_id>', views.create_review, name='create-review'),
@@ -23,6 +26,9 @@ urlpatterns = [
     path('favoritesmost', views.get_most_favorited_products, name='get-most_favorited-products'),
     path('randomproducts', views.get_random_product, name='get-random-products'),
     path('recommended', views.get_recommendations, name='get-recommendations'),
+    path('recommended/me', views.get_my_recommendations, name='get-my-recommendations'),
     path('recommended_cart/<uuid:product_id>/', views.get_recommendations_cart, name='get-recommended-cart'),
-    path('getProduct/<uuid:product_id>', views.get_product_by_id, name='get-product-id')
+    path('getProduct/<uuid:product_id>', views.get_product_by_id, name='get-product-id'),
+    path('similar/<uuid:product_id>', views.get_similar_products, name='get-similar-products'),
+    path('cache/stats', views.catalog_cache_stats, name='catalog-cache-stats'),
 ]
@@ -1,14 +1,36 @@
+import csv
+import io
+import os
+import uuid
+from collections import Counter
+from decimal import Decimal, InvalidOperation
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from .models import Product, Tag, ProductReview, FavoriteProduct, Tagged
 from .serializers import ProductSerializer
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 from django.db.models import Q
 from django.utils import timezone
-from django.db.models import Count
-from django.db.models.functions import Random
-from .recomendation import recommend_products, recommend_global_based_on_product
+from django.db import transaction
+from .pagination import InvalidCursor, get_page_size, keyset_paginate
+from .recomendation import recommend_products, record_interaction
+from .search import search_catalog, index_product
+from .sampling import sample_products
+from .tagging import parse_ids, tag_products
+from .reviews import apply_review_change, with_review_stats
+from .lean import product_values_fields, serialize_product_rows, serialize_products
+from .renderers import CATALOG_RENDERERS
+from .similarity import similar_product_ids
+from .personalization import recommend_for_user
+from .related import recommend_for_product
+from .streaming import get_stream_format, streaming_products_response
+from .importer import FORMATS, import_products, read_rows, record_import
+from .favorites import add_favorite, remove_favorite
+from .categories import active_category, apply_category_change, get_category_summaries
+from .conditional import conditional_response, product_validators
+from .facets import compute_facets
+from .cache import cache_catalog_response, cached_catalog_value, get_cache_stats, invalidate_catalog, invalidate_product
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from logs.utils import get_client_ip
@@ -29,7 +51,11 @@ def register_product(request):
 
     serializer = ProductSerializer(data=request.data)
     if serializer.is_valid():
-        product = serializer.save()
+        with transaction.atomic():
+            product = serializer.save()
+            apply_category_change(None, active_category(product))
+        index_product(product)
+        invalidate_catalog('products', 'categories')
         ip = get_client_ip(request)
         ActivityLog.objects.create(
             type='product',
@@ -51,82 +77,165 @@ def cors_test(request):
     return JsonResponse({"message": "CORS working!"})
 
 
+def paginated_response(request, queryset, ordering):
+    """
+    Devuelve una página de `queryset` paginada por cursor (parámetros cursor y page_size).
+    Si la página no cambió desde la versión que tiene el cliente responde 304 sin serializarla;
+    si no, la serializa con el camino de solo lectura de products.lean.
+    """
+    fields = product_values_fields()
+    fields += [field.lstrip('-') for field in ordering if field.lstrip('-') not in fields]
+    try:
+        rows, next_cursor = keyset_paginate(
+            queryset.values(*fields), ordering, request.GET.get('cursor'), get_page_size(request)
+        )
+    except InvalidCursor:
+        return Response({'error': 'Cursor inválido'}, status=status.HTTP_400_BAD_REQUEST)
+
+    def build_response():
+        return Response({'results': serialize_product_rows(rows), 'next': next_cursor}, status=status.HTTP_200_OK)
+
+    validators = product_validators([row['id'] for row in rows], next_cursor)
+    return conditional_response(request, validators, build_response)
+
+
 @api_view(['GET'])
+@renderer_classes(CATALOG_RENDERERS)
+@cache_catalog_response('products', 'tags')
 def product_list(request):
+    """
+    Devuelve los productos activos, los más recientes primero, paginados por cursor.
+    Con ?stream=1 (arreglo JSON) o ?stream=ndjson devuelve el catálogo completo sin paginar,
+    generado incrementalmente.
+    """
     products = Product.objects.filter(deleted_at__isnull=True)
-    serializer = ProductSerializer(products, many=True)
-    return Response(serializer.data)
+    stream_format = get_stream_format(request)
+    if stream_format:
+        return streaming_products_response(products.order_by('-created_at', '-id'), stream_format)
+    return paginated_response(request, products, ('-created_at', '-id'))
 
 
 @api_view(['GET'])
+@cache_catalog_response('categories')
 def get_product_categories(request):
     """
     Devuelve todas las categorías únicas de productos que no han sido eliminados.
     """
-    categories = Product.objects.filter(deleted_at__isnull=True).values_list('category', flat=True).distinct()
+    categories = get_category_summaries().values_list('name', flat=True)
     return Response({'categories': list(categories)}, status=status.HTTP_200_OK)
 
 
+def parse_search_filters(request):
+    """
+    Lee y normaliza los filtros de search_products (texto en minúsculas y sin espacios extra,
+    precios como Decimal) para que filtros equivalentes compartan la misma entrada de caché.
+    Lanza ValueError si un precio no es válido.
+    """
+    filters = {}
+    for field in ('name', 'category', 'brand'):
+        value = ' '.join(request.GET.get(field, '').split()).lower()
+        if value:
+            filters[field] = value
+    for field in ('min_price', 'max_price'):
+        value = request.GET.get(field)
+        if value:
+            try:
+                filters[field] = Decimal(value)
+            except InvalidOperation:
+                raise ValueError(f'{field} debe ser un número')
+            if not filters[field].is_finite():
+                raise ValueError(f'{field} debe ser un número')
+    return filters
+
+
+def filter_products(filters):
+    """
+    Devuelve los productos activos que cumplen `filters` (ver parse_search_filters); si hay
+    `name` se filtran y anotan con `rank` por relevancia.
+    """
+    conditions = Q(deleted_at__isnull=True)
+    if 'category' in filters:
+        conditions &= Q(category__icontains=filters['category'])
+    if 'brand' in filters:
+        conditions &= Q(brand__icontains=filters['brand'])
+    if 'min_price' in filters:
+        conditions &= Q(price__gte=filters['min_price'])
+    if 'max_price' in filters:
+        conditions &= Q(price__lte=filters['max_price'])
+
+    products = Product.objects.filter(conditions)
+    if 'name' in filters:
+        products = search_catalog(filters['name'], products)
+    return products
+
+
 @api_view(['GET'])
+@renderer_classes(CATALOG_RENDERERS)
 def search_products(request):
     """
     Buscar productos con filtros opcionales:
-    - name (nombre del producto)
+    - name (nombre del producto, ordenado por relevancia)
     - category (categoría del producto)
     - brand (marca)
     - min_price (precio mínimo)
     - max_price (precio máximo)
+    - cursor, page_size (paginación)
     """
-    name = request.GET.get('name', '')
-    category = request.GET.get('category', '')
-    brand = request.GET.get('brand', '')
-    min_price = request.GET.get('min_price')
-    max_price = request.GET.get('max_price')
-
-    filters = Q(deleted_at__isnull=True)
-
-    if name:
-        filters &= Q(name__icontains=name)
-    if category:
-        filters &= Q(category__icontains=category)
-    if brand:
-        filters &= Q(brand__icontains=brand)
-    if min_price:
-        filters &= Q(price__gte=min_price)
-    if max_price:
-        filters &= Q(price__lte=max_price)
-
-    products = Product.objects.filter(filters)
-    serializer = ProductSerializer(products, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    try:
+        filters = parse_search_filters(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    products = filter_products(filters)
+    if 'name' in filters:
+        return paginated_response(request, products, ('-rank', 'id'))
+    return paginated_response(request, products, ('name', 'id'))
 
 
 @api_view(['GET'])
+def search_facets(request):
+    """
+    Devuelve la cantidad de productos por categoría, marca y rango de precio para los mismos
+    filtros que search_products (name, category, brand, min_price, max_price). Se calcula con
+    una consulta agrupada y se cachea por filtro normalizado.
+    """
+    try:
+        filters = parse_search_filters(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    facets = cached_catalog_value(
+        'search_facets', filters, ('products',), lambda: compute_facets(filter_products(filters))
+    )
+    return Response({'filters': filters, 'facets': facets}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@renderer_classes(CATALOG_RENDERERS)
 def search_product(request):
     """
     Buscar productos con filtros opcionales:
-    - q (búsqueda general en name, category y brand)
-    - ordering (campo para ordenar: name, category, brand. Agregar '-' para descendente)
+    - q (búsqueda general en name, category y brand, tolerante a errores de tipeo)
+    - ordering (campo para ordenar: name, category, brand, rating_average, review_count.
+      Agregar '-' para descendente). Si se envía q sin ordering, los resultados se ordenan por relevancia.
+    - cursor, page_size (paginación)
     """
     query = request.GET.get('q', '')
-    ordering = request.GET.get('ordering', 'name')  # Por defecto ordena por nombre ascendente
-
-    filters = Q(deleted_at__isnull=True)
-
-    if query:
-        filters &= (
-            Q(name__icontains=query) |
-            Q(category__icontains=query) |
-            Q(brand__icontains=query)
-        )
+    ordering = request.GET.get('ordering')
 
-    allowed_orderings = ['name', '-name', 'category', '-category', 'brand', '-brand']
+    allowed_orderings = [
+        'name', '-name', 'category', '-category', 'brand', '-brand',
+        'rating_average', '-rating_average', 'review_count', '-review_count'
+    ]
     if ordering not in allowed_orderings:
-        ordering = 'name'
+        ordering = None if query else 'name'  # Por defecto ordena por nombre ascendente
 
-    products = Product.objects.filter(filters).order_by(ordering)
-    serializer = ProductSerializer(products, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    products = Product.objects.filter(deleted_at__isnull=True)
+    if ordering and ordering.lstrip('-') in ('rating_average', 'review_count'):
+        products = with_review_stats(products)
+    if query:
+        products = search_catalog(query, products)
+    return paginated_response(request, products, (ordering, 'id') if ordering else ('-rank', 'id'))
 
 
 @api_view(['POST'])
@@ -136,6 +245,7 @@ def create_tag(request):
     if not name:
         return Response({'error': 'El nombre del tag es obligatorio'}, status=status.HTTP_400_BAD_REQUEST)
     tag = Tag.objects.create(name=name)
+    invalidate_catalog('tags')
     return Response({'message': 'Tag creado correctamente', 'tag': {'id': str(tag.id), 'name': tag.name}}, status=status.HTTP_201_CREATED)
 
 
@@ -145,6 +255,7 @@ def delete_tag(request, tag_id):
     try:
         tag = Tag.objects.get(id=tag_id)
         tag.delete()
+        invalidate_catalog('tags')
         return Response({'message': 'Tag eliminado correctamente'}, status=status.HTTP_200_OK)
     except Tag.DoesNotExist:
         return Response({'error': 'Tag no encontrado'}, status=status.HTTP_404_NOT_FOUND)
@@ -165,14 +276,17 @@ def create_review(request, product_id):
         return Response({'error': 'El campo rating es obligatorio'}, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        review = ProductReview.objects.create(
-            product=product,
-            user=request.user,
-            rating=rating,
-            comment=comment
-        )
-        review.clean()
-        review.save()
+        with transaction.atomic():
+            review = ProductReview(
+                product=product,
+                user=request.user,
+                rating=int(rating),
+                comment=comment
+            )
+            review.clean()
+            review.save()
+            apply_review_change(product.id, review.rating, 1)
+        invalidate_product(product.id)
         return Response({'message': 'Reseña creada correctamente'}, status=status.HTTP_201_CREATED)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -182,8 +296,11 @@ def create_review(request, product_id):
 @permission_classes([IsAuthenticated])
 def delete_review(request, review_id):
     try:
-        review = ProductReview.objects.get(id=review_id, user=request.user)
-        review.delete()
+        with transaction.atomic():
+            review = ProductReview.objects.select_for_update().get(id=review_id, user=request.user)
+            review.delete()
+            apply_review_change(review.product_id, review.rating, -1)
+        invalidate_product(review.product_id)
         return Response({'message': 'Reseña eliminada correctamente'}, status=status.HTTP_200_OK)
     except ProductReview.DoesNotExist:
         return Response({'error': 'Reseña no encontrada o no autorizada'}, status=status.HTTP_404_NOT_FOUND)
@@ -194,8 +311,10 @@ def delete_review(request, review_id):
 def add_to_favorites(request, product_id):
     try:
         product = Product.objects.get(id=product_id)
-        fav, created = FavoriteProduct.objects.get_or_create(user=request.user, product=product)
-        if created:
+        if add_favorite(request.user, product):
+            record_interaction(request.user.id, product.id, 'favorites')
+            invalidate_product(product.id)
+            invalidate_catalog('favorites')
             return Response({'message': 'Producto añadido a favoritos'}, status=status.HTTP_201_CREATED)
         return Response({'message': 'El producto ya estaba en favoritos'}, status=status.HTTP_200_OK)
     except Product.DoesNotExist:
@@ -203,27 +322,32 @@ def add_to_favorites(request, product_id):
 
 
 @api_view(['GET'])
+@cache_catalog_response('tags', 'product:{product_id}')
 def get_product_by_id(request, product_id):
     """
-    Retorna la información de un producto dado su ID.
+    Retorna la información de un producto dado su ID. Responde 304 si el cliente ya tiene
+    la versión actual (If-None-Match / If-Modified-Since).
     """
-    try:
-        product = Product.objects.get(id=product_id)
-        serializer = ProductSerializer(product)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-    except Product.DoesNotExist:
-        return Response({'error': 'Producto no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+    def build_response():
+        try:
+            product = Product.objects.get(id=product_id)
+            serializer = ProductSerializer(product)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        except Product.DoesNotExist:
+            return Response({'error': 'Producto no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+
+    return conditional_response(request, product_validators([product_id]), build_response)
 
 
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def remove_from_favorites(request, product_id):
-    try:
-        favorite = FavoriteProduct.objects.get(user=request.user, product_id=product_id)
-        favorite.delete()
-        return Response({'message': 'Producto eliminado de favoritos'}, status=status.HTTP_200_OK)
-    except FavoriteProduct.DoesNotExist:
+    if not remove_favorite(request.user, product_id):
         return Response({'error': 'El producto no estaba en favoritos'}, status=status.HTTP_404_NOT_FOUND)
+    record_interaction(request.user.id, product_id, 'favorites', delta=-1)
+    invalidate_product(product_id)
+    invalidate_catalog('favorites')
+    return Response({'message': 'Producto eliminado de favoritos'}, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
@@ -241,6 +365,7 @@ def associate_tag_to_product(request):
         tag = Tag.objects.get(id=tag_id)
         tagged, created = Tagged.objects.get_or_create(product=product, tag=tag)
         if created:
+            invalidate_product(product.id)
             ip = get_client_ip(request)
             ActivityLog.objects.create(
                 type='tag',
@@ -271,6 +396,7 @@ def remove_tag_from_product(request):
     try:
         tagged = Tagged.objects.get(product=product_id, tag=tag_id)
         tagged.delete()
+        invalidate_product(tagged.product_id)
         ip = get_client_ip(request)
         ActivityLog.objects.create(
             type='tag',
@@ -284,6 +410,51 @@ def remove_tag_from_product(request):
         return Response({'error': 'La relación entre producto y tag no existe'}, status=status.HTTP_404_NOT_FOUND)
 
 
+@api_view(['POST'])
+@permission_classes([IsAdminRole])
+def bulk_tag_products(request):
+    """
+    Asocia o desasocia varios tags a varios productos en una sola petición.
+    Body: product_ids (lista), tag_ids (lista) y action ('add' por defecto o 'remove').
+    Devuelve el resultado de cada par (producto, tag).
+    """
+    product_ids = request.data.get('product_ids')
+    tag_ids = request.data.get('tag_ids')
+    action = request.data.get('action', 'add')
+
+    if not isinstance(product_ids, list) or not isinstance(tag_ids, list) or not product_ids or not tag_ids:
+        return Response({'error': 'Faltan parámetros (product_ids y tag_ids como listas)'}, status=status.HTTP_400_BAD_REQUEST)
+    if action not in ('add', 'remove'):
+        return Response({'error': "action debe ser 'add' o 'remove'"}, status=status.HTTP_400_BAD_REQUEST)
+
+    product_ids, invalid_products = parse_ids(product_ids)
+    tag_ids, invalid_tags = parse_ids(tag_ids)
+    if invalid_products or invalid_tags:
+        return Response({
+            'error': 'IDs inválidos',
+            'product_ids': invalid_products,
+            'tag_ids': invalid_tags
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    results = tag_products(product_ids, tag_ids, remove=action == 'remove')
+    changed_by_tag = Counter(result['tag_id'] for result in results if result['result'] in ('created', 'removed'))
+    if changed_by_tag:
+        invalidate_catalog('products', 'tags')
+        ip = get_client_ip(request)
+        # Una entrada por tag para que entity_id apunte a un tag existente
+        ActivityLog.objects.bulk_create([
+            ActivityLog(
+                type='tag',
+                user=request.user,
+                description=f'Se {"quitó" if action == "remove" else "agregó"} el tag a {changed} productos en lote',
+                entity_id=tag_id,
+                ip_address=ip
+            )
+            for tag_id, changed in changed_by_tag.items()
+        ])
+    return Response({'changed': sum(changed_by_tag.values()), 'results': results}, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 def get_tags_for_product(request, product_id):
     try:
@@ -295,6 +466,7 @@ def get_tags_for_product(request, product_id):
 
 
 @api_view(['GET'])
+@cache_catalog_response('tags')
 def get_tags(request):
     """
     Devuelve todos los tags disponibles.
@@ -312,8 +484,14 @@ def delete_product(request, product_id):
     """
     try:
         product = Product.objects.get(id=product_id)
-        product.deleted_at = timezone.now()
-        product.save()
+        with transaction.atomic():
+            old_category = active_category(product)
+            product.deleted_at = timezone.now()
+            product.save()
+            apply_category_change(old_category, None)
+        index_product(product)
+        invalidate_product(product.id)
+        invalidate_catalog('categories')
         ip = get_client_ip(request)
         ActivityLog.objects.create(
             type='product',
@@ -343,7 +521,13 @@ def update_product(request, product_id):
 
     serializer = ProductSerializer(product, data=request.data, partial=True)
     if serializer.is_valid():
-        serializer.save()
+        old_category = active_category(product)
+        with transaction.atomic():
+            product = serializer.save()
+            apply_category_change(old_category, active_category(product))
+        index_product(product)
+        invalidate_product(product.id)
+        invalidate_catalog('categories')
         ip = get_client_ip(request)
         ActivityLog.objects.create(
             type='product',
@@ -359,33 +543,47 @@ def update_product(request, product_id):
 @api_view(['GET'])
 def get_favorite_products(request):
     """
-    Devuelve todos los productos que el usuario autenticado ha marcado como favoritos.
+    Devuelve los productos que el usuario autenticado ha marcado como favoritos,
+    los más recientes primero, paginados por cursor.
     """
     favorites = FavoriteProduct.objects.filter(user=request.user).select_related('product')
+    try:
+        favorites, next_cursor = keyset_paginate(
+            favorites, ('-created_at', '-id'), request.GET.get('cursor'), get_page_size(request)
+        )
+    except InvalidCursor:
+        return Response({'error': 'Cursor inválido'}, status=status.HTTP_400_BAD_REQUEST)
+
     products = [fav.product for fav in favorites]
     serializer = ProductSerializer(products, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return Response({'results': serializer.data, 'next': next_cursor}, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
+@renderer_classes(CATALOG_RENDERERS)
+@cache_catalog_response('products', 'tags', 'favorites')
 def get_most_favorited_products(request):
     """
-    Devuelve los productos ordenados por la cantidad de veces que fueron marcados como favoritos.
+    Devuelve los productos ordenados por la cantidad de veces que fueron marcados como favoritos,
+    paginados por cursor.
     """
-    products = Product.objects.filter(deleted_at__isnull=True) \
-        .annotate(favorite_count=Count('favoriteproduct')) \
-        .order_by('-favorite_count')
-
-    serializer = ProductSerializer(products, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    products = Product.objects.filter(deleted_at__isnull=True)
+    return paginated_response(request, products, ('-favorite_count', 'id'))
 
 
 @api_view(['GET'])
 def get_random_product(request):
     """
-    Devuelve 4 productos aleatorios que no han sido eliminados (DB-level).
+    Devuelve productos aleatorios que no han sido eliminados.
+    - n (cantidad, por defecto 4, máximo 20)
+    - category (opcional)
     """
-    products = Product.objects.filter(deleted_at__isnull=True).order_by(Random())[:4]
+    try:
+        n = min(max(int(request.GET.get('n', 4)), 1), 20)
+    except ValueError:
+        return Response({'error': 'n debe ser un número válido'}, status=status.HTTP_400_BAD_REQUEST)
+
+    products = sample_products(n, request.GET.get('category'))
     serializer = ProductSerializer(products, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -411,10 +609,30 @@ def get_recommendations(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes(CATALOG_RENDERERS)
+def get_my_recommendations(request):
+    """
+    Devuelve los productos recomendados al usuario autenticado según el modelo de
+    factorización entrenado con train_user_recommendations (productos populares si todavía no
+    tiene recomendaciones). Parámetro opcional: limit (máx. 20).
+    """
+    try:
+        limit = min(max(int(request.GET.get('limit', 6)), 1), 20)
+    except ValueError:
+        return Response({'error': 'limit debe ser un número entero'}, status=status.HTTP_400_BAD_REQUEST)
+
+    recommended_ids = [uuid.UUID(product_id) for product_id in recommend_for_user(request.user.id, limit)]
+    return Response(serialize_products(recommended_ids), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes(CATALOG_RENDERERS)
 def get_recommendations_cart(request, product_id):
     """
-    Agrega un producto al carrito y devuelve recomendaciones basadas en IA colectiva.
-    Espera: { "product_id": 123 }
+    Devuelve las recomendaciones para un producto agregado al carrito (co-ocurrencias, similares
+    y populares, con el presupuesto de tiempo de recommend_for_product). El cliente puede
+    llamarlo en paralelo a cart/addproduct?recommendations=0.
     """
 
     if not product_id:
@@ -425,13 +643,70 @@ def get_recommendations_cart(request, product_id):
     except Product.DoesNotExist:
         return Response({"error": "Product not found."}, status=status.HTTP_404_NOT_FOUND)
 
-    # Obtener recomendaciones basadas en el producto
-    recommended_ids = recommend_global_based_on_product(product.id)
-    recommended_products = Product.objects.filter(id__in=recommended_ids)
-
-    serialized_recommendations = ProductSerializer(recommended_products, many=True)
+    recommended_ids = [uuid.UUID(related_id) for related_id in recommend_for_product(product.id)]
 
     return Response({
         "message": "Product added to cart.",
-        "recommended_products": serialized_recommendations.data
+        "recommended_products": serialize_products(recommended_ids)
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminRole])
+def catalog_cache_stats(request):
+    """
+    Devuelve los contadores de aciertos y fallos de la caché del catálogo por vista.
+    """
+    return Response({'cache': get_cache_stats()}, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminRole])
+def import_products_file(request):
+    """
+    Importa productos desde un archivo CSV o JSONL (campo `file`) en lotes.
+    Devuelve la cantidad creada y los errores de validación por línea.
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'Debe enviar un archivo en el campo file'}, status=status.HTTP_400_BAD_REQUEST)
+
+    file_format = request.data.get('format') or os.path.splitext(upload.name)[1].lstrip('.').lower()
+    if file_format not in FORMATS:
+        return Response({'error': 'Formato no soportado, usar csv o jsonl'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        batch_size = int(request.data.get('batch_size', 500))
+    except ValueError:
+        return Response({'error': 'batch_size debe ser un número entero'}, status=status.HTTP_400_BAD_REQUEST)
+
+    stream = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
+    try:
+        result = import_products(read_rows(stream, file_format), max(batch_size, 1))
+    except (UnicodeDecodeError, csv.Error) as e:
+        return Response({'error': f'No se pudo leer el archivo: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+    record_import(request.user, result, get_client_ip(request))
+    return Response({'created': result.created, 'errors': result.errors}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@renderer_classes(CATALOG_RENDERERS)
+@cache_catalog_response('products', 'tags', 'similar')
+def get_similar_products(request, product_id):
+    """
+    Devuelve los productos más parecidos por contenido (precio, categoría, marca y tags) según
+    el índice precalculado por rebuild_product_similarity (comando rebuild_similar_products).
+    Parámetro opcional: limit (máx. 20).
+    """
+    try:
+        limit = min(max(int(request.GET.get('limit', 6)), 1), 20)
+    except ValueError:
+        return Response({'error': 'limit debe ser un número entero'}, status=status.HTTP_400_BAD_REQUEST)
+    if not Product.objects.filter(id=product_id).exists():
+        return Response({'error': 'Producto no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+
+    similar_ids = similar_product_ids(product_id, limit)
+    return Response({
+        'product': str(product_id),
+        'similar_products': serialize_products(similar_ids)
     }, status=status.HTTP_200_OK)